@@ -0,0 +1,415 @@
+'''Offline benchmark of the conversion stages of the plugin.
+
+Generates synthetic PDFs and runs the render, split, OCR and chapter stages of InterfacePlugin
+on them outside of the Calibre GUI, reporting wall time, pages per second and peak RSS for each
+stage as JSON. Run it with Calibre's interpreter so the plugin modules can be imported:
+
+    calibre-debug -e benchmark.py -- --pages 20 200 --dpi 150 300 --layout two-up single --stub-tesseract
+
+Rendering uses the bundled poppler on Windows, or the one on PATH elsewhere (--poppler-path
+overrides both). OCR uses a real Tesseract given with --tesseract, or with --stub-tesseract a
+stand-in that answers instantly, so the rest of the pipeline can be measured on its own.
+'''
+import os #Built-in for Python 3.12.6
+import sys #Built-in for Python 3.12.6
+import json #Built-in for Python 3.12.6
+import time #Built-in for Python 3.12.6
+import types #Built-in for Python 3.12.6
+import random #Built-in for Python 3.12.6
+import shutil #Built-in for Python 3.12.6
+import argparse #Built-in for Python 3.12.6
+import itertools #Built-in for Python 3.12.6
+import platform #Built-in for Python 3.12.6
+import tempfile #Built-in for Python 3.12.6
+import threading #Built-in for Python 3.12.6
+import contextlib #Built-in for Python 3.12.6
+import importlib.util #Built-in for Python 3.12.6
+from concurrent.futures import ThreadPoolExecutor #Built-in for Python 3.12.6
+
+PLUGIN_DIR = os.path.dirname(os.path.abspath(__file__))
+PLUGIN_PACKAGE = 'calibre_plugins.image_based_pdf_processor'
+
+# Pages of the synthetic PDFs are drawn at this resolution, which poppler then scales to the render DPI
+SOURCE_DPI = 100
+
+STUB_TESSERACT = '''#!{python}
+# Stand-in for tesseract written by benchmark.py: reads every input image and answers with placeholder text
+import os, re, sys
+
+args = sys.argv[1:]
+if not args or args[0] in ('--version', '-v'):
+    print('tesseract 5.0.0-benchmark-stub')
+    sys.exit(0)
+
+input_name, output_base = args[0], args[1]
+separator = '\\f'
+for index, arg in enumerate(args[:-1]):
+    if arg == '-c' and args[index + 1].startswith('page_separator='):
+        separator = args[index + 1].split('=', 1)[1]
+
+if input_name == '-':
+    sys.stdin.buffer.read()
+    image_names = ['-']
+else:
+    with open(input_name, 'rb') as input_file:
+        data = input_file.read()
+    if data[:4] == b'\\x89PNG' or data[:2] in (b'P4', b'P5', b'P6'):
+        image_names = [input_name]
+    else:
+        # A list file of image paths, one per line
+        image_names = [line for line in data.decode('utf-8').splitlines() if line]
+        for image_name in image_names:
+            with open(image_name, 'rb') as image_file:
+                image_file.read()
+
+pages = []
+for image_name in image_names:
+    number = re.search(r'(\\d+)', os.path.basename(image_name))
+    number = int(number.group(1)) if number else 0
+    # Start a chapter every 20 images so chapter division has headings to find
+    heading = f'Chapter {{number // 20 + 1}}\\n' if number % 20 == 1 else ''
+    pages.append(f'{{heading}}Benchmark text of {{os.path.basename(image_name)}}\\n')
+
+text = separator.join(pages)
+if output_base == 'stdout':
+    sys.stdout.write(text)
+else:
+    with open(output_base + '.txt', 'w', encoding='utf-8') as output_file:
+        output_file.write(text)
+'''
+
+def load_plugin_module(name):
+    '''Import a plugin module under the name Calibre gives it, so its own plugin imports resolve.'''
+    module_name = f'{PLUGIN_PACKAGE}.{name}'
+    if module_name not in sys.modules:
+        spec = importlib.util.spec_from_file_location(module_name, os.path.join(PLUGIN_DIR, f'{name}.py'))
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[module_name] = module
+        spec.loader.exec_module(module)
+    return sys.modules[module_name]
+
+def load_plugin():
+    '''Load the plugin modules from the source tree and return the InterfacePlugin class.'''
+    # The bundled pdf2image and pytesseract are imported from the plugin folder, as Calibre does from the zip
+    sys.path.insert(0, PLUGIN_DIR)
+
+    if 'calibre_plugins' not in sys.modules:
+        sys.modules['calibre_plugins'] = types.ModuleType('calibre_plugins')
+    package = types.ModuleType(PLUGIN_PACKAGE)
+    package.__path__ = [PLUGIN_DIR]
+    sys.modules[PLUGIN_PACKAGE] = package
+
+    for name in ('manifest', 'metrics', 'ocr_cache', 'layout', 'preprocess'):
+        load_plugin_module(name)
+    return load_plugin_module('main').InterfacePlugin
+
+def make_benchmark_plugin(interface_plugin, tesseract_cmd, workers, batch_size):
+    '''Build a stand-alone copy of the plugin action that runs without the Calibre GUI.'''
+    # Copy the methods and settings rather than subclassing, since InterfaceAction needs a running GUI
+    attributes = {key: value for key, value in vars(interface_plugin).items()
+                  if not key.startswith('__')}
+    plugin_stages = type('PluginStages', (), attributes)
+
+    class BenchmarkPlugin(plugin_stages):
+        interface_action_base_plugin = contextlib.nullcontext()
+
+        # Every run starts cold, so cached OCR text must not hide the cost of Tesseract
+        ocr_cache_size_mb = 0
+
+        def __init__(self):
+            self.ocr_workers = workers
+            self.ocr_batch_size = batch_size
+
+        def start_ocr(self, *args, **kwargs):
+            ocr_queue = super().start_ocr(*args, **kwargs)
+            ocr_queue.pytesseract.pytesseract.tesseract_cmd = tesseract_cmd
+            return ocr_queue
+
+    return BenchmarkPlugin()
+
+def write_stub_tesseract(folder):
+    '''Write the stand-in tesseract into the folder and return the command that runs it.'''
+    script_path = os.path.join(folder, 'tesseract_stub.py')
+    with open(script_path, 'w', encoding='utf-8') as script_file:
+        script_file.write(STUB_TESSERACT.format(python=sys.executable))
+
+    if os.name == 'nt':
+        # Windows cannot run a script directly, so wrap it in a batch file
+        command_path = os.path.join(folder, 'tesseract_stub.cmd')
+        with open(command_path, 'w', encoding='utf-8') as command_file:
+            command_file.write(f'@"{sys.executable}" "{script_path}" %*\n')
+        return command_path
+
+    os.chmod(script_path, 0o755)
+    return script_path
+
+def generate_pdf(pdf_path, page_count, layout, seed=0, scanned=False):
+    '''Write a PDF of page_count synthetic text pages, each a two-page spread or a single page.
+
+    The pages cycle through a few templates of random words, with a chapter heading on the first,
+    so generation stays fast and light on memory for long books. Scanned pages get shaded paper,
+    specks and a skew of up to two degrees, as found in the scans that preprocessing cleans up.
+    '''
+    from PIL import Image, ImageDraw, ImageChops #v10.4.0
+
+    rng = random.Random(seed)
+    page_width, page_height = int(8.5 * SOURCE_DPI), 11 * SOURCE_DPI
+    columns = 2 if layout == 'two-up' else 1
+    words = ['lorem', 'ipsum', 'dolor', 'sit', 'amet', 'consectetur', 'adipiscing', 'elit', 'sed', 'do',
+             'eiusmod', 'tempor', 'incididunt', 'ut', 'labore', 'et', 'dolore', 'magna', 'aliqua']
+
+    templates = []
+    for template_index in range(min(page_count, 8)):
+        image = Image.new('L', (columns * page_width, page_height), 255)
+        draw = ImageDraw.Draw(image)
+        for column in range(columns):
+            left = column * page_width + SOURCE_DPI // 2
+            top = SOURCE_DPI // 2
+            if template_index == 0:
+                draw.text((left, top), f'Chapter {column + 1}', fill=0)
+                top += 40
+            for line_top in range(top, page_height - SOURCE_DPI // 2, 14):
+                line = ' '.join(rng.choice(words) for _ in range(12))
+                draw.text((left, line_top), line, fill=0)
+
+        if scanned:
+            shading = Image.linear_gradient('L').rotate(90).resize(image.size).point(lambda level: 170 + level // 5)
+            image = ImageChops.darker(image, shading)
+            draw = ImageDraw.Draw(image)
+            for _ in range(image.width * image.height // 2000):
+                x, y = rng.randrange(image.width), rng.randrange(image.height)
+                draw.point((x, y), fill=rng.randrange(100))
+            image = image.rotate(rng.uniform(-2, 2), resample=Image.BICUBIC, fillcolor=200)
+        templates.append(image)
+
+    pages = [templates[index % len(templates)] for index in range(page_count)]
+    pages[0].save(pdf_path, 'PDF', save_all=True, append_images=pages[1:], resolution=SOURCE_DPI)
+
+def sample_rss():
+    '''Return a function giving the current RSS in bytes of this process and its children.'''
+    try:
+        import psutil
+        process = psutil.Process()
+
+        def rss():
+            total = process.memory_info().rss
+            for child in process.children(recursive=True):
+                try:
+                    total += child.memory_info().rss
+                except psutil.Error:
+                    pass
+            return total
+        return rss
+    except ImportError:
+        pass
+
+    if os.path.exists('/proc/self/statm'):
+        page_size = os.sysconf('SC_PAGE_SIZE')
+
+        def rss():
+            # Without psutil only this process is counted, not the poppler and tesseract children
+            with open('/proc/self/statm') as statm:
+                return int(statm.read().split()[1]) * page_size
+        return rss
+
+    return None
+
+class PeakMemory:
+    '''Sample the RSS on a background thread while the block runs and keep the highest value seen.'''
+
+    def __init__(self, rss, interval=0.01):
+        self.rss = rss
+        self.interval = interval
+        self.peak = None
+        self.stopped = threading.Event()
+
+    def sample(self):
+        while True:
+            self.peak = max(self.peak or 0, self.rss())
+            if self.stopped.wait(self.interval):
+                break
+
+    def __enter__(self):
+        if self.rss is not None:
+            self.thread = threading.Thread(target=self.sample, daemon=True)
+            self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.rss is not None:
+            self.stopped.set()
+            self.thread.join()
+
+@contextlib.contextmanager
+def measure_stage(stages, name, page_count, rss):
+    '''Time the block and record its wall time, throughput and peak RSS under the stage name.'''
+    stage = {}
+    with PeakMemory(rss) as memory:
+        start_time = time.perf_counter()
+        yield stage
+        seconds = time.perf_counter() - start_time
+    stage.update(seconds=round(seconds, 4),
+                 pages_per_second=round(page_count / seconds, 2) if seconds else None,
+                 peak_rss_bytes=memory.peak)
+    stages[name] = stage
+
+def timed(iterable, timer):
+    '''Yield from the iterable, adding the time spent producing each item to timer[0].'''
+    iterator = iter(iterable)
+    while True:
+        start_time = time.perf_counter()
+        try:
+            item = next(iterator)
+        except StopIteration:
+            return
+        finally:
+            timer[0] += time.perf_counter() - start_time
+        yield item
+
+def run_case(plugin, pdf_path, work_folder, poppler_path, rss, preprocess=False):
+    '''Run every stage on one PDF and return the measurements of each stage.
+
+    With preprocess, the halves are cleaned up on a pool of --workers threads before they are saved,
+    as in the plugin, and the split stage reports how long it waited for them.
+    '''
+    from pdf2image import pdfinfo_from_path #v1.17.0
+
+    page_count = pdfinfo_from_path(pdf_path, poppler_path=poppler_path)['Pages']
+    kept_pages = plugin.select_pages(page_count)
+    image_names = plugin.get_image_names(kept_pages)
+    image_output_folder = os.path.join(work_folder, 'img')
+    ocr_output_folder = os.path.join(work_folder, '_ocr')
+    os.makedirs(image_output_folder, exist_ok=True)
+    stages = {}
+
+    with measure_stage(stages, 'render', len(kept_pages), rss):
+        for _ in plugin.render_pages(pdf_path, poppler_path, kept_pages):
+            pass
+
+    # Splitting needs rendered pages, so the pages are rendered again and the render time is reported apart
+    with measure_stage(stages, 'split', len(kept_pages), rss) as stage:
+        render_time = [0.0]
+        if plugin.split_mode == 'poppler':
+            # Poppler renders the halves directly, so the render time also covers finding the spines
+            halves = timed(plugin.render_halves(pdf_path, poppler_path, kept_pages), render_time)
+        else:
+            halves = plugin.split_pages(timed(plugin.render_pages(pdf_path, poppler_path, kept_pages), render_time))
+        # Cleaning is timed as the time to get cleaned halves less the time to get the halves
+        split_time, cleaned_time = [0.0], [0.0]
+        with ThreadPoolExecutor(max_workers=max(1, plugin.ocr_workers)) if preprocess else contextlib.nullcontext() as executor:
+            if preprocess:
+                halves = timed(plugin.clean_pages(timed(halves, split_time), executor), cleaned_time)
+            for _ in plugin.save_pages(halves, image_output_folder, image_names):
+                pass
+    stage['render_seconds'] = round(render_time[0], 4)
+    if preprocess:
+        stage['preprocess_seconds'] = round(cleaned_time[0] - split_time[0], 4)
+    image_sizes = [entry.stat().st_size for entry in os.scandir(image_output_folder)]
+    stage['image_bytes'] = sum(image_sizes)
+    # Single pages are saved as one image, spreads as two
+    stage['images'] = len(image_sizes)
+
+    with measure_stage(stages, 'ocr', len(image_sizes), rss) as stage:
+        stage['result'] = plugin.perform_ocr_on_images(image_output_folder, work_folder)
+
+    with measure_stage(stages, 'chapters', len(image_sizes), rss) as stage:
+        stage['result'] = plugin.divide_text_into_chapters(ocr_output_folder)
+
+    return {'source_pages': page_count, 'kept_pages': len(kept_pages), 'stages': stages}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the conversion stages on synthetic PDFs.')
+    parser.add_argument('--pages', type=int, nargs='+', default=[20, 100], help='page counts of the generated PDFs')
+    parser.add_argument('--dpi', type=int, nargs='+', default=[200], help='render resolutions to measure')
+    parser.add_argument('--profile', nargs='+', choices=['color', 'grayscale', 'bilevel'], default=['color'],
+                        help='render profiles to measure')
+    parser.add_argument('--split-mode', nargs='+', choices=['poppler', 'image'], default=['image'],
+                        help='ways of splitting spreads to measure')
+    parser.add_argument('--no-gutters', action='store_true',
+                        help='cut every page in the middle instead of at its detected spine')
+    parser.add_argument('--skip-blank', action='store_true',
+                        help='give blank pages empty text instead of running Tesseract on them')
+    parser.add_argument('--preprocess', nargs='+', choices=['off', 'on'], default=['off'],
+                        help='measure without and/or with cleaning the pages up before OCR')
+    parser.add_argument('--scanned', action='store_true',
+                        help='generate shaded, speckled and skewed pages like scans')
+    parser.add_argument('--layout', nargs='+', choices=['two-up', 'single'], default=['two-up'],
+                        help='two-page spreads or single pages per PDF page')
+    tesseract = parser.add_mutually_exclusive_group(required=True)
+    tesseract.add_argument('--tesseract', help='path of the tesseract executable to OCR with')
+    tesseract.add_argument('--stub-tesseract', action='store_true',
+                           help='OCR with an instant stand-in to measure the pipeline without Tesseract')
+    parser.add_argument('--poppler-path', help='folder holding pdftoppm and pdfinfo')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='concurrent Tesseract processes')
+    parser.add_argument('--batch-size', type=int, default=4, help='images per Tesseract process')
+    parser.add_argument('--repeat', type=int, default=1, help='runs of each case')
+    parser.add_argument('--output', help='write the JSON report to this file instead of stdout')
+    parser.add_argument('--keep', action='store_true', help='keep the generated PDFs and outputs')
+    args = parser.parse_args(argv)
+
+    interface_plugin = load_plugin()
+
+    poppler_path = args.poppler_path
+    if poppler_path is None and os.name == 'nt':
+        poppler_path = os.path.join(PLUGIN_DIR, 'poppler-24.07.0', 'Library', 'bin')
+
+    rss = sample_rss()
+    work_root = tempfile.mkdtemp(prefix='pdf_processor_benchmark_')
+    try:
+        tesseract_cmd = write_stub_tesseract(work_root) if args.stub_tesseract else args.tesseract
+
+        runs = []
+        for page_count in args.pages:
+            for layout in args.layout:
+                pdf_path = os.path.join(work_root, f'{layout}_{page_count}.pdf')
+                generate_pdf(pdf_path, page_count, layout, scanned=args.scanned)
+
+                for dpi, profile, split_mode, preprocess, repeat in itertools.product(
+                        args.dpi, args.profile, args.split_mode, args.preprocess, range(args.repeat)):
+                    plugin = make_benchmark_plugin(interface_plugin, tesseract_cmd, args.workers, args.batch_size)
+                    plugin.render_dpi = dpi
+                    plugin.render_profile = profile
+                    plugin.split_mode = split_mode
+                    plugin.detect_gutters = not args.no_gutters
+                    plugin.skip_blank_pages = args.skip_blank
+
+                    work_folder = os.path.join(work_root, f'{layout}_{page_count}_{dpi}_{profile}_{split_mode}_{preprocess}_{repeat}')
+                    run = {'pages': page_count, 'layout': layout, 'dpi': dpi, 'profile': profile,
+                           'split_mode': split_mode, 'preprocess': preprocess, 'repeat': repeat}
+                    run.update(run_case(plugin, pdf_path, work_folder, poppler_path, rss, preprocess == 'on'))
+                    runs.append(run)
+                    print(f'{layout} {page_count} pages at {dpi} dpi in {profile}, split by {split_mode}, preprocess {preprocess}: '
+                          + ', '.join(f'{name} {stage["seconds"]}s' for name, stage in run['stages'].items()),
+                          file=sys.stderr)
+
+                    if not args.keep:
+                        shutil.rmtree(work_folder, ignore_errors=True)
+
+        report = {
+            'config': {
+                'workers': args.workers,
+                'batch_size': args.batch_size,
+                'gutters': not args.no_gutters and load_plugin_module('layout').numpy_installed,
+                'skip_blank': args.skip_blank,
+                'scanned': args.scanned,
+                'tesseract': 'stub' if args.stub_tesseract else args.tesseract,
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'peak_rss_includes_children': rss is not None and 'psutil' in sys.modules,
+            },
+            'runs': runs,
+        }
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8') as output_file:
+                json.dump(report, output_file, indent=2)
+        else:
+            json.dump(report, sys.stdout, indent=2)
+            print()
+    finally:
+        if args.keep:
+            print(f'Benchmark files kept in: {work_root}', file=sys.stderr)
+        else:
+            shutil.rmtree(work_root, ignore_errors=True)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+from PIL import Image, ImageChops, ImageFilter #v10.4.0
+import math #Built-in for Python 3.12.6
+
+try:
+    import numpy #Optional, gutter detection is skipped without it
+    numpy_installed = True
+except ImportError:
+    numpy_installed = False
+
+# Width in pixels of the thumbnails that page layouts are detected on
+THUMBNAIL_WIDTH = 256
+
+def make_thumbnail(image):
+    '''Return a grayscale copy of the page image about THUMBNAIL_WIDTH pixels wide.'''
+    if image.mode not in ('L', 'RGB'):
+        # Reducing works on 8-bit channels, which bilevel and palette images do not have
+        image = image.convert('L')
+    factor = image.width // THUMBNAIL_WIDTH
+    if factor > 1:
+        image = image.reduce(factor)
+    return image.convert('L')
+
+def find_gutter(thumbnail, window=(0.3, 0.7), min_gap=0.005):
+    '''Find the spine of a two-page spread on a grayscale thumbnail of the page.
+
+    Pixels much darker than the paper count as ink, and each column of the thumbnail is
+    measured by its share of ink. The spine is the widest run of columns in the window (as
+    fractions of the width) that are either nearly free of ink, the gap between the two pages,
+    or nearly all ink, the shadow of the binding. It is returned as a fraction of the width, or
+    None if the page is a single page: portrait, or with no such run at least min_gap wide,
+    like a cover or a plate printed across the spread. A blank spread is split in the middle.
+    '''
+    width, height = thumbnail.size
+    if width <= height:
+        return None
+
+    pixels = numpy.asarray(thumbnail, dtype=numpy.uint8)
+    paper = numpy.percentile(pixels, 95)
+    profile = (pixels < 0.6 * paper).mean(axis=0)
+
+    inked = profile[profile > 0]
+    if inked.size == 0:
+        return 0.5
+
+    # Text columns are compared with the typical column, so faint or dense print both work
+    gutter_columns = (profile <= 0.2 * numpy.median(inked)) | (profile >= 0.9)
+    start, end = int(width * window[0]), int(math.ceil(width * window[1]))
+    edges = numpy.flatnonzero(numpy.diff(numpy.concatenate(([0], gutter_columns[start:end].astype(numpy.int8), [0]))))
+    run_starts, run_ends = edges[0::2] + start, edges[1::2] + start
+    if run_starts.size == 0:
+        return None
+
+    longest = numpy.argmax(run_ends - run_starts)
+    run_start, run_end = int(run_starts[longest]), int(run_ends[longest])
+    if run_end - run_start < max(1, min_gap * width):
+        return None
+
+    if run_start > start and run_end < end:
+        gutter = (run_start + run_end) / 2
+    else:
+        # The gap runs out of the window, e.g. next to a blank page, so cut as close to the middle as it allows
+        gutter = min(max(width / 2, run_start), run_end)
+    return gutter / width
+
+def is_blank(thumbnail, ink_ratio=0.9, max_specks=0.001):
+    '''Check whether a grayscale thumbnail of a page or half page has no content worth OCR.
+
+    The paper level around each pixel is the lightest of the nearby 4x4 blocks of the thumbnail,
+    which follows shading and yellowed or uneven paper, and pixels darker than ink_ratio of it count
+    as ink. On a THUMBNAIL_WIDTH thumbnail even a page number in body text leaves a few touching ink
+    pixels, while a speck of dust leaves a lone one, so the page is blank only if no two ink pixels
+    touch and at most max_specks of its pixels are specks. It needs only Pillow.
+    '''
+    paper = thumbnail.reduce(4).filter(ImageFilter.MaxFilter(3)).resize(thumbnail.size, Image.BILINEAR)
+    # A pixel is ink where ink_ratio of the paper level is still lighter than it
+    ink = ImageChops.subtract(paper.point(lambda level: int(ink_ratio * level)), thumbnail)
+    ink = ink.point(lambda difference: 255 if difference else 0)
+
+    # Each ink pixel's number of ink neighbours, from 0 to 8
+    neighbours = ink.filter(ImageFilter.Kernel((3, 3), [1, 1, 1, 1, 0, 1, 1, 1, 1], scale=255))
+    touching = ImageChops.multiply(ink, neighbours.point(lambda count: 255 if count else 0))
+    return (touching.histogram()[255] == 0
+            and ink.histogram()[255] <= max_specks * thumbnail.width * thumbnail.height)
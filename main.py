@@ -5,17 +5,316 @@ import zipfile #Built-in for Python 3.12.6
 import tempfile #Built-in for Python 3.12.6
 import shutil #Built-in for Python 3.12.6
 import re #Built-in for Python 3.12.6
+import math #Built-in for Python 3.12.6
+from io import BytesIO #Built-in for Python 3.12.6
+import time #Built-in for Python 3.12.6
+import hashlib #Built-in for Python 3.12.6
+import threading #Built-in for Python 3.12.6
+from collections import Counter, deque #Built-in for Python 3.12.6
+from contextlib import contextmanager, nullcontext #Built-in for Python 3.12.6
+from concurrent.futures import ThreadPoolExecutor, wait, as_completed, FIRST_COMPLETED, ALL_COMPLETED #Built-in for Python 3.12.6
+
+# File written last into an extracted Tesseract folder, holding the cache key it was extracted for
+TESSERACT_CACHE_MARKER = '.extracted'
+
+@contextmanager
+def exclusive_lock(lock_path, timeout=600, stale_after=900):
+    '''Hold a lock file shared by every Calibre process and thread, breaking locks left by crashes.'''
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            break
+        except FileExistsError:
+            try:
+                if time.time() - os.path.getmtime(lock_path) > stale_after:
+                    os.remove(lock_path)
+                    continue
+            except OSError:
+                continue
+            if time.monotonic() > deadline:
+                raise TimeoutError(f'Timed out waiting for lock file: {lock_path}')
+            time.sleep(0.1)
+    try:
+        yield
+    finally:
+        os.close(fd)
+        os.remove(lock_path)
+
+class ConversionCancelled(Exception):
+    '''Raised between pages once the user has cancelled a conversion.'''
+
+def raise_if_cancelled(cancel_event):
+    if cancel_event is not None and cancel_event.is_set():
+        raise ConversionCancelled()
+
+def next_page_image(images, page):
+    '''Return the next image from a poppler stream, which should be the given page.
+
+    A stream that ends before every page was rendered is an error, rather than a shorter book.
+    '''
+    image = next(images, None)
+    if image is None:
+        raise RuntimeError(f'Poppler did not render page {page}')
+    return image
+
+def strip_page_separator(text):
+    '''Remove the form feed that Tesseract writes after a page, which batched pages come without.
+
+    A page's text, cache entry and manifest hash are then the same whether it was recognised on
+    its own or in a batch, and whichever batch it happened to be in.
+    '''
+    return text.rstrip('\f')
+
+class OCRQueue:
+    '''Fans submitted page images out to concurrent Tesseract runs and saves one text file per page.
+
+    Pages are grouped into batches of batch_size, and each batch is recognised by a single
+    tesseract process so its model loading is paid once per batch rather than once per page.
+    Each worker thread only waits on its own tesseract process, so threads are enough to keep
+    every core busy. At most two batches per worker are kept pending so a fast producer cannot
+    run arbitrarily far ahead of OCR. With skip_blank, blank pages get an empty text file
+    without running Tesseract.
+    '''
+
+    def __init__(self, pytesseract, ocr_output_folder, workers, batch_size=1, ocr_cache=None, lang=None, config='',
+                 progress=None, cancel_event=None, executor=None, manifest=None, metrics=None, skip_blank=False):
+        self.pytesseract = pytesseract
+        self.ocr_output_folder = ocr_output_folder
+        self.workers = max(1, workers)
+        self.batch_size = max(1, batch_size)
+        self.ocr_cache = ocr_cache
+        self.lang = lang
+        self.config = config
+        self.progress = progress
+        self.cancel_event = cancel_event
+        self.manifest = manifest
+        self.metrics = metrics
+        self.skip_blank = skip_blank
+        # A shared executor belongs to the caller, e.g. when several books are OCR'd at once
+        self.owns_executor = executor is None
+        self.executor = executor or ThreadPoolExecutor(max_workers=self.workers)
+        self.batch = []
+        self.pending = set()
+        self.page_count = 0
+        self.cache_hits = 0
+        self.blank_pages = 0
+
+        if ocr_cache is not None:
+            self.tesseract_version = str(pytesseract.get_tesseract_version(cached=True))
+        self.start_time = time.perf_counter()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def submit(self, image_path, image=None, image_hash=None):
+        '''Queue the saved image for OCR, waiting for a free slot if the workers are saturated.
+
+        If the page is still in memory it is passed as image and piped straight to Tesseract.
+        Batched pages are read back from their files by Tesseract, so only their paths are kept.
+        image_hash is the hash of the saved file, if the caller already knows it. A page still in
+        memory is checked for blankness here, so the batch does not need to keep it.
+        '''
+        from calibre_plugins.image_based_pdf_processor.layout import make_thumbnail, is_blank
+        from calibre_plugins.image_based_pdf_processor.metrics import stage
+
+        blank = None
+        if self.skip_blank and image is not None:
+            with stage('blank'):
+                blank = is_blank(make_thumbnail(image))
+        self.batch.append((image_path, image if self.batch_size == 1 else None, image_hash, blank))
+        if len(self.batch) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        '''Hand the current batch to the workers.'''
+        if not self.batch:
+            return
+        while len(self.pending) >= 2 * self.workers:
+            self.collect(FIRST_COMPLETED)
+        self.pending.add(self.executor.submit(self.ocr_batch, self.batch))
+        self.batch = []
+
+    def ocr_batch(self, batch):
+        '''Perform OCR on a batch of images, reusing cached text, and save each page's text.
+
+        Returns the number of pages in the batch, how many of them came from the OCR cache and how
+        many were blank.
+        '''
+        # The batch runs on a worker thread, so the book's metrics are made active here
+        with self.metrics.activate() if self.metrics is not None else nullcontext():
+            return self.recognise_batch(batch)
+
+    def recognise_batch(self, batch):
+        from calibre_plugins.image_based_pdf_processor.manifest import hash_file, hash_text
+        from calibre_plugins.image_based_pdf_processor.layout import make_thumbnail, is_blank
+        from calibre_plugins.image_based_pdf_processor.metrics import stage
+
+        texts = {}
+        image_hashes = {}
+        uncached = []
+        blank_count = 0
+        for image_path, image, image_hash, blank in batch:
+            if image_hash is None and (self.ocr_cache is not None or self.manifest is not None):
+                image_hash = hash_file(image_path)
+            image_hashes[image_path] = image_hash
+
+            # Identical page images OCR'd with the same Tesseract settings give the same text
+            if self.ocr_cache is not None:
+                texts[image_path] = self.ocr_cache.get(self.cache_key(image_hash))
+            if texts.get(image_path) is not None:
+                # Entries written before the separator was stripped still end with it
+                texts[image_path] = strip_page_separator(texts[image_path])
+                continue
+
+            if self.skip_blank and blank is None:
+                with stage('blank'), Image.open(image_path) as saved_image:
+                    blank = is_blank(make_thumbnail(saved_image))
+            if blank:
+                # A blank page has no text to find, so Tesseract is not run on it
+                texts[image_path] = ''
+                blank_count += 1
+            else:
+                uncached.append((image_path, image))
+
+        with stage('ocr'):
+            if len(uncached) == 1:
+                # Tesseract reads the page from stdin (or the saved file) and writes the text to stdout,
+                # so no temporary files are written and the PNG is never decoded in Python
+                image_path, image = uncached[0]
+                texts[image_path] = strip_page_separator(self.pytesseract.image_to_string(
+                    image if image is not None else image_path, lang=self.lang, config=self.config, use_stdin=True))
+            elif uncached:
+                # One tesseract process, and one model load, for every uncached page of the batch
+                image_paths = [image_path for image_path, _ in uncached]
+                ocr_texts = self.pytesseract.images_to_strings(image_paths, lang=self.lang, config=self.config)
+                # The per-image fallback of images_to_strings keeps the separator, so it is stripped here too
+                texts.update(zip(image_paths, map(strip_page_separator, ocr_texts)))
+
+        for image_path, _ in uncached:
+            if self.ocr_cache is not None:
+                self.ocr_cache.put(self.cache_key(image_hashes[image_path]), texts[image_path])
+
+        for image_path, _, _, _ in batch:
+            # Save the OCR text to a file
+            image_file = os.path.basename(image_path)
+            text_file_path = os.path.join(self.ocr_output_folder, f'{os.path.splitext(image_file)[0]}.txt')
+            with stage('save_text') as record, open(text_file_path, 'w', encoding='utf-8') as text_file:
+                text_file.write(texts[image_path])
+                record['bytes'] += len(texts[image_path].encode('utf-8'))
+
+            if self.manifest is not None:
+                self.manifest.record(image_file, 'ocr', image=image_hashes[image_path], text=hash_text(texts[image_path]))
+
+        return len(batch), len(batch) - len(uncached) - blank_count, blank_count
+
+    def cache_key(self, image_hash):
+        return self.ocr_cache.key(image_hash, self.tesseract_version, self.lang, self.config)
+
+    def collect(self, return_when=ALL_COMPLETED):
+        '''Wait for pending batches, report progress and re-raise the first OCR error, if any.'''
+        raise_if_cancelled(self.cancel_event)
+        done, self.pending = wait(self.pending, return_when=return_when)
+        for future in done:
+            page_count, cache_hits, blank_pages = future.result()
+            self.page_count += page_count
+            self.cache_hits += cache_hits
+            self.blank_pages += blank_pages
+        if done and self.progress is not None:
+            self.progress(self.page_count)
+
+    def finish(self):
+        '''Wait for every submitted image and return the status message with the OCR throughput.'''
+        self.flush()
+        # Collect batches one at a time so progress is reported and cancellation is noticed
+        while self.pending:
+            self.collect(FIRST_COMPLETED)
+        elapsed = time.perf_counter() - self.start_time
+        pages_per_second = self.page_count / elapsed if elapsed > 0 else 0.0
+        return (f'OCR completed! {self.page_count} pages in {elapsed:.1f}s '
+                f'({pages_per_second:.2f} pages/s, {self.workers} workers, {self.cache_hits} from cache, '
+                f'{self.blank_pages} blank). '
+                f'Text saved in: {self.ocr_output_folder}')
+
+    def close(self):
+        '''Stop the workers, dropping images that have not started OCR yet.'''
+        if self.owns_executor:
+            self.executor.shutdown(wait=True, cancel_futures=True)
+        else:
+            for future in self.pending:
+                future.cancel()
+            wait(self.pending)
 
 class InterfacePlugin(InterfaceAction):
     name = 'Image-based PDF Processor Calibre Plugin'
 
     action_spec = ('Image-based PDF Processor Calibre Plugin', None, 'Convert PDF to images and text', 'Ctrl+Shift+I')
 
+    # Resolution the PDF pages are rendered at
+    render_dpi = 200
+
+    # Colours the pages are rendered in: 'color', 'grayscale' (8-bit) or 'bilevel' (1-bit black and white).
+    # Tesseract binarises pages itself, so the single-channel profiles lose nothing for scanned text
+    render_profile = 'color'
+
+    # How spreads are split in two: 'image' renders the whole spread once and crops it in memory,
+    # 'poppler' renders each half directly. Poppler decodes a scanned page again for every crop and
+    # for the gutter thumbnail, and renders the crop box rather than the media box
+    split_mode = 'image'
+
+    # Split spreads at their detected spine, and keep single pages whole, instead of cutting every
+    # page in the middle. Needs NumPy
+    detect_gutters = True
+
+    # Spreads following a page whose spine is within this fraction of the page width of theirs are cut
+    # at the same split, so poppler keeps rendering them in the same pair of processes
+    split_tolerance = 0.01
+
+    # Give blank pages and halves an empty text file instead of running Tesseract on them
+    skip_blank_pages = False
+
+    # Clean up the halves (adaptive threshold, despeckle, deskew) before they are saved and OCR'd.
+    # The default for books converted without choosing; needs NumPy
+    preprocess_pages = False
+
+    # Number of concurrent Tesseract processes, overridden by the plugin settings
+    ocr_workers = os.cpu_count() or 1
+
+    # Number of pages recognised by each tesseract process, overridden by the plugin settings
+    ocr_batch_size = 4
+
+    # Number of books converted at the same time by process_books
+    concurrent_books = 2
+
+    # Size limit of the OCR result cache in MB, 0 disables the cache
+    ocr_cache_size_mb = 512
+
+    # The OCR cache shared by every book and thread, opened on first use by get_ocr_cache
+    ocr_cache = None
+    ocr_cache_lock = threading.Lock()
+
     def genesis(self):
         '''Initial setup for the plugin.'''
         icon = get_icons('images/icon.png', 'Image-based PDF Processor Calibre Plugin')
         self.qaction.setIcon(icon)
         self.qaction.triggered.connect(self.show_dialog)
+        self.apply_settings()
+
+    def apply_settings(self):
+        '''Load the settings saved from the plugin configuration widget.'''
+        from calibre_plugins.image_based_pdf_processor.ui import prefs
+        self.ocr_workers = prefs['ocr_workers']
+        self.ocr_batch_size = prefs['ocr_batch_size']
+        self.ocr_cache_size_mb = prefs['ocr_cache_size_mb']
+        self.concurrent_books = prefs['concurrent_books']
+        self.render_profile = prefs['render_profile']
+        self.split_mode = prefs['split_mode']
+        self.detect_gutters = prefs['detect_gutters']
+        self.skip_blank_pages = prefs['skip_blank_pages']
+        self.preprocess_pages = prefs['preprocess_pages']
 
     def show_dialog(self):
         '''Show the main UI dialog for PDF conversion.'''
@@ -23,199 +322,668 @@ class InterfacePlugin(InterfaceAction):
         d = PDFConverterDialog(self.gui, self.qaction.icon(), self)
         d.show()
 
+    def get_cache_folder(self, name):
+        '''Return the path of a folder for the plugin's persistent caches inside Calibre's cache folder.'''
+        from calibre.constants import cache_dir #Built-in for Calibre 7.17
+        return os.path.join(cache_dir(), 'image_based_pdf_processor', name)
+
+    def get_ocr_cache(self):
+        '''Return the OCR cache shared by every book and OCR thread, or None if the cache is turned off.
+
+        Opening the cache measures every entry in it, so it is opened once, the first time a book
+        needs it, rather than for every book. A size limit changed in the settings since then is
+        applied to the open cache.
+        '''
+        if self.ocr_cache_size_mb <= 0:
+            return None
+        from calibre_plugins.image_based_pdf_processor.ocr_cache import OCRCache
+
+        max_size = self.ocr_cache_size_mb * 1024 * 1024
+        with self.ocr_cache_lock:
+            if self.ocr_cache is None:
+                self.ocr_cache = OCRCache(self.get_cache_folder('ocr'), max_size)
+            else:
+                self.ocr_cache.max_size = max_size
+            return self.ocr_cache
+
     def extract_tesseract(self):
-        '''Extract Tesseract from the plugin zip file to a temporary directory.'''
-        try:
-            # Create a temporary directory to extract Tesseract
-            temp_dir = tempfile.mkdtemp()
+        '''Return the Tesseract folder extracted from the plugin zip file into the persistent cache.
 
+        The cached copy lives in a folder named after a hash of the zip's Tesseract members, so it
+        is reused across runs and concurrent conversions and replaced when the plugin is updated.
+        '''
+        try:
             # Get the path of the plugin zip file
             plugin_zip_path = os.path.join(os.path.dirname(__file__))
 
-            # Extract the Tesseract folder from the zip file
             with zipfile.ZipFile(plugin_zip_path, 'r') as zip_ref:
-                for file in zip_ref.namelist():
-                    if file.startswith('Tesseract-OCR/'):
-                        zip_ref.extract(file, temp_dir)
+                members = [info for info in zip_ref.infolist() if info.filename.startswith('Tesseract-OCR/')]
+
+                # Key the cache on the names, sizes and CRCs already stored in the zip directory
+                digest = hashlib.sha256()
+                for info in sorted(members, key=lambda info: info.filename):
+                    digest.update(f'{info.filename}:{info.file_size}:{info.CRC}\n'.encode('utf-8'))
+                cache_key = digest.hexdigest()[:16]
+
+                cache_root = self.get_cache_folder('tesseract')
+                install_dir = os.path.join(cache_root, cache_key)
+                tesseract_dir = os.path.join(install_dir, 'Tesseract-OCR')
+                os.makedirs(cache_root, exist_ok=True)
+
+                if self.is_tesseract_cache_valid(install_dir, cache_key, members):
+                    return tesseract_dir
+
+                # Only one conversion extracts at a time; the others reuse its result
+                with exclusive_lock(os.path.join(cache_root, '.lock')):
+                    if self.is_tesseract_cache_valid(install_dir, cache_key, members):
+                        return tesseract_dir
+
+                    # Extract next to the cache and rename, so a partial copy is never picked up
+                    temp_dir = tempfile.mkdtemp(prefix='tmp-', dir=cache_root)
+                    for info in members:
+                        zip_ref.extract(info, temp_dir)
+                    with open(os.path.join(temp_dir, TESSERACT_CACHE_MARKER), 'w', encoding='utf-8') as marker:
+                        marker.write(cache_key)
+
+                    shutil.rmtree(install_dir, ignore_errors=True)
+                    os.rename(temp_dir, install_dir)
+
+                    # Remove copies left by older plugin versions or interrupted extractions
+                    for entry in os.listdir(cache_root):
+                        if entry not in (cache_key, '.lock'):
+                            shutil.rmtree(os.path.join(cache_root, entry), ignore_errors=True)
 
             # Return the path to the extracted Tesseract directory
-            tesseract_dir = os.path.join(temp_dir, 'Tesseract-OCR')
             return tesseract_dir
         except Exception as e:
             return f'Error during Tesseract extraction: {e}'
 
-    def convert_pdf_to_images(self, pdf_path, output_folder):
-        '''Convert PDF to images, split double-page images, and save them in a structured folder.'''
+    def is_tesseract_cache_valid(self, install_dir, cache_key, members):
+        '''Check that a cached Tesseract folder was fully extracted for this key and has every file.'''
         try:
-           with self.interface_action_base_plugin: 
-            from pdf2image import convert_from_path #v1.17.0
+            with open(os.path.join(install_dir, TESSERACT_CACHE_MARKER), 'r', encoding='utf-8') as marker:
+                if marker.read() != cache_key:
+                    return False
+            return all(
+                info.is_dir() or os.path.getsize(os.path.join(install_dir, info.filename)) == info.file_size
+                for info in members
+            )
+        except OSError:
+            return False
+
+    def convert_pdf_to_images(self, pdf_path, output_folder, progress=None, cancel_event=None,
+                              ocr_executor=None, tesseract_dir=None, preprocess=None, book_name=None):
+        '''Convert PDF to images, split double-page images, and save them in a structured folder.
+
+        Pages are streamed through rendering, splitting, saving and OCR one at a time as poppler
+        emits them, so memory use is bounded by a few pages regardless of the length of the book.
+        progress is called as progress(stage, done, total) as pages go through each stage, and
+        setting cancel_event stops the conversion at the next page. Batches of books pass a
+        shared ocr_executor and an already extracted tesseract_dir. preprocess chooses for this
+        book whether the halves are cleaned up by clean_pages before they are saved and OCR'd,
+        and defaults to the preprocess_pages setting. The book is saved in the book_name folder of
+        output_folder, named after the PDF file by default.
+
+        The time, bytes written, CPU and memory of every stage and poppler or tesseract process
+        are saved in metrics.json in the book folder and summarised in the returned message.
+        '''
+        from calibre_plugins.image_based_pdf_processor.metrics import Metrics, stage, watch_process
+        from calibre_plugins.image_based_pdf_processor.preprocess import numpy_installed
+
+        report = progress or (lambda stage, done, total: None)
+        # Cleaning pages up needs NumPy, and is skipped without it
+        preprocess = (self.preprocess_pages if preprocess is None else preprocess) and numpy_installed
+        # Stages and processes of this book, including OCR on the worker threads, report to these metrics
+        metrics = Metrics()
+        try:
+           with self.interface_action_base_plugin, metrics, metrics.activate(): 
+            import pdf2image.pdf2image #v1.17.0
+            from pdf2image import pdfinfo_from_path #v1.17.0
             # Poppler path configuration
             poppler_path = get_resources('poppler-24.07.0/Library/bin')
 
-            # Create the output folder named after the input file (without extension)
-            input_file_name = os.path.splitext(os.path.basename(pdf_path))[0]
-            image_output_folder = os.path.join(output_folder, input_file_name, 'img')
-
-            os.makedirs(image_output_folder, exist_ok=True)
+            from calibre_plugins.image_based_pdf_processor.manifest import PageManifest, hash_text
+            pdf2image.pdf2image.process_hook = watch_process
 
-            images = convert_from_path(pdf_path, poppler_path=poppler_path)
+            # Create the book folder, named after the input file (without extension) unless a batch named it
+            book_folder = os.path.join(output_folder, book_name or self.get_book_name(pdf_path))
+            image_output_folder = os.path.join(book_folder, 'img')
+            ocr_output_folder = os.path.join(book_folder, '_ocr')
 
-            # Keep only even pages and the first and last pages
-            total_pages = len(images)
-            filtered_images = [images[0]]  # Always keep the first page
+            os.makedirs(image_output_folder, exist_ok=True)
 
-            for i in range(1, total_pages - 1):
-                if i % 2 == 0:  # Keep only even pages
-                    filtered_images.append(images[i])
+            # Decide up front which pages are kept so the image names are known before rendering
+            with stage('pdfinfo'):
+                page_count = pdfinfo_from_path(pdf_path, poppler_path=poppler_path)['Pages']
+            kept_pages = self.select_pages(page_count)
+            image_names = self.get_image_names(kept_pages)
+
+            # Get Tesseract first so OCR can start as soon as the first pages are saved
+            if tesseract_dir is None:
+                report('Preparing Tesseract', 0, 1)
+                tesseract_dir = self.extract_tesseract()
+                report('Preparing Tesseract', 1, 1)
+
+            # The manifest records every completed stage, so a rerun only redoes missing or stale work
+            manifest_path = os.path.join(book_folder, 'manifest.jsonl')
+            with PageManifest(manifest_path, self.get_manifest_source(pdf_path, preprocess)) as manifest:
+                reused_images = self.find_completed_pages(manifest, kept_pages, image_output_folder)
+                pending_pages = [page for page in kept_pages if page not in reused_images]
+                stale_images = [(image_path, image_hash) for images in reused_images.values()
+                                for image_path, image_hash in images
+                                if not self.is_ocr_current(manifest, image_path, image_hash, ocr_output_folder)]
+
+                # Pages found to be single pages give one image instead of two, and lower the total as they are saved
+                ocr_total = len(stale_images) + 2 * len(pending_pages)
+                ocr_progress = lambda done: report('OCR', done, ocr_total)
+                with self.start_ocr(image_output_folder, tesseract_dir, ocr_progress, cancel_event, ocr_executor,
+                                    manifest, metrics) as ocr_queue:
+                    # Images kept from an earlier run only need OCR if their text is missing or stale
+                    for image_path, image_hash in stale_images:
+                        ocr_queue.submit(image_path, image_hash=image_hash)
+
+                    # Each page flows through render, split and save and is OCR'd while later pages render
+                    if self.split_mode == 'poppler':
+                        halves = self.render_halves(pdf_path, poppler_path, pending_pages, cancel_event)
+                    else:
+                        halves = self.split_pages(self.render_pages(pdf_path, poppler_path, pending_pages))
+                    if preprocess:
+                        # Cleaning shares the OCR threads, so it neither holds up rendering nor oversubscribes the cores
+                        halves = self.clean_pages(halves, ocr_queue.executor)
+                    pages = self.save_pages(halves, image_output_folder, image_names)
+                    for rendered_count, (page_number, saved_images) in enumerate(pages, start=1):
+                        manifest.record(f'source_page_{page_number}', 'split',
+                                        images={os.path.basename(image_path): image_hash
+                                                for image_path, _, image_hash in saved_images})
+                        ocr_total -= 2 - len(saved_images)
+                        for image_path, page, image_hash in saved_images:
+                            ocr_queue.submit(image_path, page, image_hash)
+                        report('Rendering', rendered_count, len(pending_pages))
+                        raise_if_cancelled(cancel_event)
+
+                    ocr_result = ocr_queue.finish()
+
+                # Divide text into chapters after all OCR text files are created, unless no text changed
+                report('Chapters', 0, 1)
+                saved_names = [image_name for page in kept_pages
+                               for image_name in manifest.get(f'source_page_{page}', 'split')['images']]
+                chapters_source = hash_text(' '.join(manifest.get(image_name, 'ocr')['text'] for image_name in saved_names))
+                chapters_record = manifest.get('book', 'chapters')
+                if chapters_record and chapters_record['text'] == chapters_source:
+                    chapter_result = chapters_record['result']
+                else:
+                    with stage('chapters'):
+                        chapter_result = self.divide_text_into_chapters(ocr_output_folder)
+                    if not chapter_result.startswith('Error'):
+                        manifest.record('book', 'chapters', text=chapters_source, result=chapter_result)
+                report('Chapters', 1, 1)
+
+            metrics_path = os.path.join(book_folder, 'metrics.json')
+            metrics.save(metrics_path)
+
+            reused_count = len(kept_pages) - len(pending_pages)
+            return (f'Conversion successful! {len(saved_names)} images saved in: {image_output_folder} '
+                    f'({reused_count} pages reused from a previous run). {ocr_result}. {chapter_result} '
+                    f'{metrics.summary()}. Metrics saved in: {metrics_path}')
+        except ConversionCancelled:
+            return 'Conversion cancelled.'
+        except Exception as e:
+            return f'Error during conversion: {e}'
 
-            if total_pages > 1:
-                filtered_images.append(images[-1])  # Always keep the last page
+    def get_book_name(self, pdf_path):
+        '''Return the name of the book folder of a PDF: its file name without the extension.'''
+        return os.path.splitext(os.path.basename(pdf_path))[0]
+
+    def get_selected_pdf_paths(self):
+        '''Return the paths of the PDF formats of the books selected in the library view, mapped to their book folder names.
+
+        Calibre names format files "Title - Author", so books with the same title and author
+        would share a folder; those are told apart by their Calibre book id.
+        '''
+        db = self.gui.current_db.new_api
+        book_ids = self.gui.library_view.get_selected_ids()
+        pdf_paths = {book_id: db.format_abspath(book_id, 'PDF') for book_id in book_ids if db.has_format(book_id, 'PDF')}
+        names = {book_id: self.get_book_name(pdf_path) for book_id, pdf_path in pdf_paths.items()}
+        name_counts = Counter(name.casefold() for name in names.values())
+        return {pdf_path: names[book_id] if name_counts[names[book_id].casefold()] == 1 else f'{names[book_id]} ({book_id})'
+                for book_id, pdf_path in pdf_paths.items()}
+
+    def process_books(self, pdf_paths, output_folder, progress=None, cancel_event=None, preprocess=None,
+                      book_names=None):
+        '''Convert several PDFs through a bounded queue of concurrent books.
+
+        Up to concurrent_books books are converted at a time. They share one extracted Tesseract
+        and one pool of ocr_workers OCR threads, so adding books never oversubscribes the machine.
+        preprocess is passed on to convert_pdf_to_images, either as one choice for every book or
+        as a dict from PDF path to the choice for that book; books left out use the setting.
+        book_names maps PDF paths to the names of their book folders, which default to the file
+        names. Books running at once must not share a folder, so a batch in which two books would
+        (on a case-insensitive file system) is refused before anything is converted.
+        '''
+        report = progress or (lambda stage, done, total: None)
+        book_names = {pdf_path: (book_names or {}).get(pdf_path) or self.get_book_name(pdf_path) for pdf_path in pdf_paths}
+        name_counts = Counter(book_names[pdf_path].casefold() for pdf_path in pdf_paths)
+        shared_names = sorted({book_names[pdf_path] for pdf_path in pdf_paths if name_counts[book_names[pdf_path].casefold()] > 1})
+        if shared_names:
+            return f'Error during batch processing: several books would be saved in the same folder: {", ".join(shared_names)}'
 
-            # Split the double-page images and save the individual pages
-            page_counter = 1
-            for image in filtered_images:
+        try:
+           with self.interface_action_base_plugin: 
+            report('Preparing Tesseract', 0, 1)
+            tesseract_dir = self.extract_tesseract()
+            report('Preparing Tesseract', 1, 1)
+
+            results = []
+            with ThreadPoolExecutor(max_workers=max(1, self.ocr_workers)) as ocr_executor, \
+                 ThreadPoolExecutor(max_workers=max(1, self.concurrent_books)) as book_executor:
+                futures = {}
+                for pdf_path in pdf_paths:
+                    # Report each book's OCR progress under its own name
+                    book_name = book_names[pdf_path]
+                    book_progress = (lambda stage, done, total, book_name=book_name:
+                                     report(f'{book_name} ({stage})', done, total) if stage == 'OCR' else None)
+                    book_preprocess = preprocess.get(pdf_path) if isinstance(preprocess, dict) else preprocess
+                    future = book_executor.submit(
+                        self.convert_pdf_to_images, pdf_path, output_folder, book_progress, cancel_event,
+                        ocr_executor, tesseract_dir, book_preprocess, book_name)
+                    futures[future] = book_name
+
+                for done_count, future in enumerate(as_completed(futures), start=1):
+                    if future.cancelled():
+                        results.append((futures[future], 'Conversion cancelled.'))
+                    else:
+                        results.append((futures[future], future.result()))
+                    report('Books', done_count, len(futures))
+
+                    # Books still waiting in the queue are dropped once the batch is cancelled
+                    if cancel_event is not None and cancel_event.is_set():
+                        for pending_future in futures:
+                            pending_future.cancel()
+
+            succeeded = sum(result.startswith('Conversion successful!') for _, result in results)
+            cancelled = sum(result == 'Conversion cancelled.' for _, result in results)
+            failures = [f'{book_name}: {result}' for book_name, result in results
+                        if not result.startswith('Conversion successful!') and result != 'Conversion cancelled.']
+            summary = (f'Processed {len(results)} books: {succeeded} succeeded, {len(failures)} failed, '
+                       f'{cancelled} cancelled. Output saved in: {output_folder}')
+            return '\n'.join([summary] + failures)
+        except Exception as e:
+            return f'Error during batch processing: {e}'
+
+    def select_pages(self, page_count):
+        '''Return the 1-based numbers of the pages to keep: the first, every odd page and the last.'''
+        # Keep only even 0-based indices and the first and last pages
+        kept_pages = [page for page in range(1, page_count + 1) if page % 2 == 1]
+        if page_count > 1 and kept_pages[-1] != page_count:
+            kept_pages.append(page_count)  # Always keep the last page
+        return kept_pages
+
+    def get_image_names(self, kept_pages):
+        '''Map each kept page number to the file names of its left and right halves.'''
+        return {page: [f'page_{2 * index + 1}.png', f'page_{2 * index + 2}.png'] for index, page in enumerate(kept_pages)}
+
+    def get_manifest_source(self, pdf_path, preprocess=False):
+        '''Describe the PDF and the settings that the saved images and text depend on.'''
+        stat = os.stat(pdf_path)
+        return {'size': stat.st_size, 'mtime': stat.st_mtime, 'dpi': self.render_dpi, 'profile': self.render_profile,
+                'split': self.split_mode, 'gutters': self.uses_gutter_detection(),
+                'skip_blank': self.skip_blank_pages, 'preprocess': preprocess}
+
+    def find_completed_pages(self, manifest, kept_pages, image_output_folder):
+        '''Return the images of the pages already split by an earlier run and unchanged on disk.
+
+        The result maps each such page number to its (image_path, image_hash) pairs.
+        '''
+        from calibre_plugins.image_based_pdf_processor.manifest import hash_file
+
+        completed_pages = {}
+        for page in kept_pages:
+            record = manifest.get(f'source_page_{page}', 'split')
+            if record is None:
+                continue
+            images = [(os.path.join(image_output_folder, image_name), image_hash)
+                      for image_name, image_hash in record['images'].items()]
+            if all(hash_file(image_path) == image_hash for image_path, image_hash in images):
+                completed_pages[page] = images
+        return completed_pages
+
+    def is_ocr_current(self, manifest, image_path, image_hash, ocr_output_folder):
+        '''Check that the image was OCR'd in its current state and its text file is unchanged.'''
+        from calibre_plugins.image_based_pdf_processor.manifest import hash_file
+
+        image_name = os.path.basename(image_path)
+        record = manifest.get(image_name, 'ocr')
+        text_file_path = os.path.join(ocr_output_folder, f'{os.path.splitext(image_name)[0]}.txt')
+        return (record is not None and record['image'] == image_hash
+                and hash_file(text_file_path, text=True) == record['text'])
+
+    def render_pages(self, pdf_path, poppler_path, pages):
+        '''Render the pages, yielding (page number, image) as soon as poppler has rendered each page.
+
+        Poppler renders the next page while the caller splits and saves this one. Pages are rendered
+        in the colours of render_profile, and grayscale or bilevel pages stay single-channel images
+        (mode 'L' or '1') through splitting, saving and OCR.
+        '''
+        from pdf2image import convert_from_path_iter #v1.17.0
+        from calibre_plugins.image_based_pdf_processor.metrics import stage
+
+        # Only the kept pages are passed down, so poppler never rasterises a dropped page
+        images = convert_from_path_iter(pdf_path, dpi=self.render_dpi, poppler_path=poppler_path, pages=pages,
+                                        grayscale=self.render_profile == 'grayscale',
+                                        monochrome=self.render_profile == 'bilevel')
+        try:
+            for page_number in pages:
+                # Only the wait for poppler counts as render time, not the work done on the previous page
+                with stage('render'):
+                    image = next_page_image(images, page_number)
+                yield page_number, image
+        finally:
+            # Stops poppler if the conversion ends early
+            images.close()
+
+    def get_page_sizes(self, pdf_path, poppler_path, pages):
+        '''Return the size in pixels of each page as poppler renders it at render_dpi, from pdfinfo.
+
+        pdfinfo gives the crop box size in points before the page rotation, so the size is scaled
+        to render_dpi the way pdftoppm does and swapped for pages turned by 90 or 270 degrees.
+        '''
+        from pdf2image import pdfinfo_from_path #v1.17.0
+
+        info = pdfinfo_from_path(pdf_path, poppler_path=poppler_path, first_page=pages[0], last_page=pages[-1])
+        page_sizes = {}
+        for page in pages:
+            # e.g. 'Page    3 size: 841.89 x 595.276 pts (A4)' and 'Page    3 rot:  90'
+            width, _, height = info[f'Page {page:4d} size'].split()[:3]
+            width, height = (math.ceil(float(points) * self.render_dpi / 72) for points in (width, height))
+            if int(info[f'Page {page:4d} rot']) % 180 == 90:
+                width, height = height, width
+            page_sizes[page] = (width, height)
+        return page_sizes
+
+    def uses_gutter_detection(self):
+        '''Check whether spreads are split at their detected spine, which needs NumPy.'''
+        from calibre_plugins.image_based_pdf_processor.layout import numpy_installed
+        return self.detect_gutters and numpy_installed
+
+    def find_split(self, image):
+        '''Return the x coordinate to cut the page image at, or None to keep it as a single page.'''
+        from calibre_plugins.image_based_pdf_processor.layout import make_thumbnail, find_gutter
+
+        if not self.uses_gutter_detection():
+            return image.width // 2
+        gutter = find_gutter(make_thumbnail(image))
+        return None if gutter is None else round(gutter * image.width)
+
+    def find_page_layouts(self, pdf_path, poppler_path, pages, page_sizes, cancel_event=None):
+        '''Yield (page number, width, height, split x or None) for each page as poppler renders it.
+
+        The spine is found on a grayscale thumbnail that poppler renders THUMBNAIL_WIDTH pixels
+        wide, so it costs a fraction of rendering the page. Without gutter detection every page
+        is split in the middle and nothing is rendered. Setting cancel_event stops at the next page.
+        '''
+        from pdf2image import convert_from_path_iter #v1.17.0
+        from calibre_plugins.image_based_pdf_processor.layout import THUMBNAIL_WIDTH, find_gutter
+        from calibre_plugins.image_based_pdf_processor.metrics import stage
+
+        if not self.uses_gutter_detection():
+            for page in pages:
+                width, height = page_sizes[page]
+                yield page, width, height, width // 2
+            return
+
+        thumbnails = convert_from_path_iter(pdf_path, poppler_path=poppler_path, pages=pages, use_cropbox=True,
+                                            grayscale=True, size=(THUMBNAIL_WIDTH, None))
+        try:
+            for page in pages:
+                raise_if_cancelled(cancel_event)
+                width, height = page_sizes[page]
+                with stage('layout'):
+                    thumbnail = next_page_image(thumbnails, page)
+                    gutter = find_gutter(thumbnail)
+                yield page, width, height, None if gutter is None else round(gutter * width)
+        finally:
+            thumbnails.close()
+
+    def render_halves(self, pdf_path, poppler_path, pages, cancel_event=None):
+        '''Render the left and right halves of each page directly, yielding (page number, [left half, right half]).
+
+        Poppler crops each half while rendering, so the whole spread is never held in memory. The
+        halves are cut at the spine found by find_page_layouts, or in the middle, of the crop box of
+        the page, which is also the size pdfinfo reports; a single page is rendered whole as the only
+        image. A pair of poppler processes, one rendering the left halves and one the right halves,
+        is started for the rest of the book at the layout of a page. It keeps rendering the pages
+        that follow while they have the same size and a split within split_tolerance of the page
+        width, since scanned spines drift a little from page to page, and the first page that does
+        not fit starts a new pair. Setting cancel_event stops at the next page.
+        '''
+        from pdf2image import convert_from_path_iter #v1.17.0
+        from calibre_plugins.image_based_pdf_processor.metrics import stage
+
+        if not pages:
+            return
+        with stage('pdfinfo'):
+            page_sizes = self.get_page_sizes(pdf_path, poppler_path, pages)
+
+        layouts = self.find_page_layouts(pdf_path, poppler_path, pages, page_sizes, cancel_event)
+        halves = []
+        stream_layout = None
+        try:
+            for index, (page_number, width, height, split) in enumerate(layouts):
+                fits = False
+                if stream_layout is not None:
+                    stream_width, stream_height, stream_split = stream_layout
+                    fits = (width, height) == (stream_width, stream_height) and (
+                        split == stream_split if None in (split, stream_split)
+                        else abs(split - stream_split) <= self.split_tolerance * width)
+
+                if not fits:
+                    # Stops the poppler processes of the previous layout, which rendered at most a page ahead
+                    for images in halves:
+                        images.close()
+                    stream_layout = (width, height, split)
+                    if split is None:
+                        crops = [None]
+                    else:
+                        crops = [
+                            (0, 0, split, height),  # Left half of the page
+                            (split, 0, width - split, height),  # Right half of the page
+                        ]
+                    halves = [convert_from_path_iter(pdf_path, dpi=self.render_dpi, poppler_path=poppler_path,
+                                                     pages=pages[index:], use_cropbox=True,
+                                                     grayscale=self.render_profile == 'grayscale',
+                                                     monochrome=self.render_profile == 'bilevel', crop=crop)
+                              for crop in crops]
+
+                with stage('render'):
+                    images = [next_page_image(images, page_number) for images in halves]
+                yield page_number, images
+        finally:
+            # Stops poppler if the conversion ends early
+            for images in halves:
+                images.close()
+            layouts.close()
+
+    def split_pages(self, images):
+        '''Split each double-page image at its spine, yielding (page number, [left half, right half]).
+
+        A page that find_split takes for a single page is yielded whole as the only image.
+        '''
+        from calibre_plugins.image_based_pdf_processor.metrics import stage
+
+        for page_number, image in images:
+            with stage('layout'):
+                split = self.find_split(image)
+
+            if split is None:
+                yield page_number, [image]
+                continue
+
+            with stage('split'):
                 # Get image size (width, height)
                 width, height = image.size
 
-                # Split the image vertically into two parts
-                left_page = image.crop((0, 0, width // 2, height))  # Left half of the image
-                right_page = image.crop((width // 2, 0, width, height))  # Right half of the image
-
-                # Save the left page
-                left_image_path = os.path.join(image_output_folder, f'page_{page_counter}.png')
-                left_page.save(left_image_path, 'PNG')
-                page_counter += 1
-
-                # Save the right page
-                right_image_path = os.path.join(image_output_folder, f'page_{page_counter}.png')
-                right_page.save(right_image_path, 'PNG')
-                page_counter += 1
-
-            # Extract Tesseract and perform OCR on the images
-            tesseract_dir = self.extract_tesseract()
-            ocr_result = self.perform_ocr_on_images(image_output_folder, tesseract_dir)
-
-            # Clean up temporary Tesseract directory
-            shutil.rmtree(tesseract_dir)
-
-            # Divide text into chapters after all OCR text files are created
-            chapter_result = self.divide_text_into_chapters(os.path.join(output_folder, input_file_name, '_ocr'))
-
-            return f'Conversion successful! {page_counter - 1} images saved in: {image_output_folder}. {ocr_result}. {chapter_result}'
-        except Exception as e:
-            return f'Error during conversion: {e}'
+                halves = [
+                    image.crop((0, 0, split, height)),  # Left half of the image
+                    image.crop((split, 0, width, height)),  # Right half of the image
+                ]
+            yield page_number, halves
+
+    def clean_pages(self, pages, executor=None):
+        '''Clean up the halves of each page for OCR, yielding (page number, [cleaned halves]) in page order.
+
+        Each half is binarized with an adaptive threshold, rid of specks and deskewed by
+        preprocess.clean_page, so Tesseract gets black text on white that it reads faster and
+        more reliably than noisy, skewed or shaded scans. The cleaned 1-bit halves are what is saved.
+        Cleaning takes a few tenths of a second per half, so with an executor the halves are cleaned
+        on its threads, the pages of up to ocr_workers pages at a time, while later pages render.
+        '''
+        from calibre_plugins.image_based_pdf_processor.preprocess import clean_page
+        from calibre_plugins.image_based_pdf_processor.metrics import stage, active_metrics
+
+        # The halves may be cleaned on worker threads, which report to the book's metrics too
+        metrics = active_metrics()
+
+        def clean(half):
+            with metrics.activate() if metrics is not None else nullcontext(), stage('preprocess'):
+                return clean_page(half)
+
+        if executor is None:
+            for page_number, halves in pages:
+                yield page_number, [clean(half) for half in halves]
+            return
+
+        pending = deque()
+        try:
+            for page_number, halves in pages:
+                pending.append((page_number, [executor.submit(clean, half) for half in halves]))
+                if len(pending) >= max(1, self.ocr_workers):
+                    page_number, futures = pending.popleft()
+                    yield page_number, [future.result() for future in futures]
+            while pending:
+                page_number, futures = pending.popleft()
+                yield page_number, [future.result() for future in futures]
+        finally:
+            # Halves not cleaned yet are dropped if the conversion ends early
+            for _, futures in pending:
+                for future in futures:
+                    future.cancel()
+
+    def save_pages(self, pages, image_output_folder, image_names):
+        '''Save the halves of each page under their names from get_image_names.
+
+        A single page is saved under the first name only, and what an earlier run saved under the
+        second name is removed along with its text, so it does not end up in the chapters.
+        Yields (page number, [(image_path, image, image_hash), ...]) once the files are written.
+        '''
+        from calibre_plugins.image_based_pdf_processor.manifest import hash_bytes
+        from calibre_plugins.image_based_pdf_processor.metrics import stage
+
+        for page_number, halves in pages:
+            saved_images = []
+            for image_name, half in zip(image_names[page_number], halves):
+                # Encode in memory so the file is hashed without being read back
+                buffer = BytesIO()
+                with stage('encode'):
+                    half.save(buffer, 'PNG')
+                image_path = os.path.join(image_output_folder, image_name)
+                with stage('save_images') as record, open(image_path, 'wb') as image_file:
+                    record['bytes'] += image_file.write(buffer.getbuffer())
+                saved_images.append((image_path, half, hash_bytes(buffer.getbuffer())))
+
+            for image_name in image_names[page_number][len(halves):]:
+                text_name = f'{os.path.splitext(image_name)[0]}.txt'
+                for stale_path in (os.path.join(image_output_folder, image_name),
+                                   os.path.join(os.path.dirname(image_output_folder), '_ocr', text_name)):
+                    if os.path.exists(stale_path):
+                        os.remove(stale_path)
+            yield page_number, saved_images
+
+    def start_ocr(self, image_output_folder, tesseract_dir, progress=None, cancel_event=None, executor=None,
+                  manifest=None, metrics=None):
+        '''Point pytesseract at the extracted Tesseract and return a worker pool that OCRs submitted images.'''
+        import pytesseract #v0.3.13
+        from calibre_plugins.image_based_pdf_processor.metrics import watch_process
+        # Specify the path to tesseract executable inside the extracted folder
+        pytesseract.pytesseract.tesseract_cmd = os.path.join(tesseract_dir, 'tesseract.exe')
+        pytesseract.pytesseract.process_hook = watch_process
+
+        # Set the OCR text output folder next to the image folder
+        ocr_output_folder = os.path.join(os.path.dirname(image_output_folder), '_ocr')
+        os.makedirs(ocr_output_folder, exist_ok=True)
+
+        # Parallel pages already use every core, so keep each tesseract single-threaded. The limit is
+        # given to the tesseract processes alone, and set again for every book, so it never leaks
+        # into Calibre or into a later run with a single worker
+        tesseract_env = None
+        if self.ocr_workers > 1 and 'OMP_THREAD_LIMIT' not in os.environ:
+            tesseract_env = {'OMP_THREAD_LIMIT': '1'}
+        pytesseract.pytesseract.tesseract_env = tesseract_env
+
+        return OCRQueue(pytesseract, ocr_output_folder, self.ocr_workers, self.ocr_batch_size, self.get_ocr_cache(),
+                        progress=progress, cancel_event=cancel_event, executor=executor, manifest=manifest,
+                        metrics=metrics, skip_blank=self.skip_blank_pages)
 
     def perform_ocr_on_images(self, image_output_folder, tesseract_dir):
         '''Perform OCR on images in the folder and save the text results.'''
         try:
            with self.interface_action_base_plugin: 
-            import pytesseract #v0.3.13
-            # Specify the path to tesseract executable inside the extracted folder
-            pytesseract.pytesseract.tesseract_cmd = os.path.join(tesseract_dir, 'tesseract.exe')
-
-            # Set the OCR text output folder next to the image folder
-            ocr_output_folder = os.path.join(os.path.dirname(image_output_folder), '_ocr')
-            os.makedirs(ocr_output_folder, exist_ok=True)
-
-            # Iterate over the images in the folder
-            for image_file in os.listdir(image_output_folder):
-                if image_file.endswith('.png'):
-                    image_path = os.path.join(image_output_folder, image_file)
+            with self.start_ocr(image_output_folder, tesseract_dir) as ocr_queue:
+                # Iterate over the images in the folder
+                for image_file in os.listdir(image_output_folder):
+                    if image_file.endswith('.png'):
+                        ocr_queue.submit(os.path.join(image_output_folder, image_file))
 
-                    # Perform OCR on the image
-                    ocr_text = pytesseract.image_to_string(Image.open(image_path))
-
-                    # Save the OCR text to a file
-                    text_file_path = os.path.join(ocr_output_folder, f'{os.path.splitext(image_file)[0]}.txt')
-                    with open(text_file_path, 'w', encoding='utf-8') as text_file:
-                        text_file.write(ocr_text)
-
-            return f'OCR completed! Text saved in: {ocr_output_folder}'
+                return ocr_queue.finish()
         except Exception as e:
             return f'Error during OCR: {e}'
 
     def divide_text_into_chapters(self, ocr_output_folder):
-        '''Find chapter headings in OCR text files and divide the text into chapters.'''
+        '''Find chapter headings in OCR text files and divide the text into chapters.
+
+        The pages are read once in page order and every line is streamed straight into the
+        chapter it belongs to, so the work is linear in the length of the book.
+        '''
         try:
             # Define a pattern for identifying chapter headings
             chapter_heading_pattern = re.compile(r'^\bChapter\b\s+\d+', re.IGNORECASE)
 
-            # Collect headings and their corresponding text files
-            chapter_headings = []
+            chapters_folder = os.path.join(os.path.dirname(ocr_output_folder), 'chapters')
+            chapter_file = None
+            chapter_count = 0
 
-            for text_file in sorted(os.listdir(ocr_output_folder)):
-                if text_file.endswith('.txt'):
-                    file_path = os.path.join(ocr_output_folder, text_file)
-                    
-                    # Read the content of the OCR text file
+            try:
+                for file_path in self.build_page_index(ocr_output_folder):
                     with open(file_path, 'r', encoding='utf-8') as file:
-                        content = file.read()
-
-                    # Split content into lines and consider only the first 5 lines for heading detection
-                    lines = content.split('\n')
-                    heading_lines = lines[:5]
-
-                    # Find all chapter headings and their positions
-                    for i, line in enumerate(heading_lines):
-                        match = chapter_heading_pattern.match(line.strip())
-                        if match:
-                            chapter_number = re.search(r'\d+', match.group()).group()
-                            chapter_headings.append((file_path, i, chapter_number))
-
-            if chapter_headings:
-                # Create chapters based on detected headings
-                chapters_folder = os.path.join(os.path.dirname(ocr_output_folder), 'chapters')
-                os.makedirs(chapters_folder, exist_ok=True)
-
-                for i, (start_file_path, start_line, chapter_number) in enumerate(chapter_headings):
-                    start_page = start_file_path
-                    if i + 1 < len(chapter_headings):
-                        end_file_path = chapter_headings[i + 1][0]
-                    else:
-                        end_file_path = None
-                    
-                    chapter_text = self.extract_chapter_text(start_file_path, start_line, end_file_path)
-                    
-                    # Save the chapter text to a new file
-                    chapter_file_path = os.path.join(chapters_folder, f'Chapter_{chapter_number}.txt')
-                    with open(chapter_file_path, 'w', encoding='utf-8') as chapter_file:
-                        chapter_file.write(chapter_text)
-
+                        for i, line in enumerate(file):
+                            # Consider only the first 5 lines of a page for heading detection
+                            match = chapter_heading_pattern.match(line.strip()) if i < 5 else None
+                            if match:
+                                # The heading starts a new chapter, which ends the previous one
+                                if chapter_file is not None:
+                                    chapter_file.close()
+                                chapter_number = re.search(r'\d+', match.group()).group()
+                                os.makedirs(chapters_folder, exist_ok=True)
+                                chapter_file_path = os.path.join(chapters_folder, f'Chapter_{chapter_number}.txt')
+                                chapter_file = open(chapter_file_path, 'w', encoding='utf-8')
+                                chapter_count += 1
+
+                            # Text before the first heading does not belong to any chapter
+                            if chapter_file is not None:
+                                chapter_file.write(line)
+            finally:
+                if chapter_file is not None:
+                    chapter_file.close()
+
+            if chapter_count:
                 return f'Chapters divided and saved in: {chapters_folder}'
             return 'No chapter headings found in the OCR text files.'
         except Exception as e:
             return f'Error during chapter division: {e}'
 
-    def extract_chapter_text(self, start_file_path, start_line, end_file_path):
-        '''Extract text for a chapter from start to end file.'''
-        chapter_text = []
-        
-        # Extract text from the start file
-        with open(start_file_path, 'r', encoding='utf-8') as file:
-            lines = file.readlines()
-            chapter_text.extend(lines[start_line:])
-
-        # Extract text from the intermediate files if any
-        current_file_path = start_file_path
-        while current_file_path != end_file_path:
-            next_file_path = self.get_next_file_path(current_file_path)
-            if next_file_path is None:
-                break
-            with open(next_file_path, 'r', encoding='utf-8') as file:
-                chapter_text.extend(file.readlines())
-            current_file_path = next_file_path
-
-        # Extract text from the end file, if exists
-        if end_file_path:
-            with open(end_file_path, 'r', encoding='utf-8') as file:
-                chapter_text.extend(file.readlines())
-
-        return ''.join(chapter_text)
-
-    def get_next_file_path(self, current_file_path):
-        '''Get the next text file path in the directory.'''
-        files = sorted([f for f in os.listdir(os.path.dirname(current_file_path)) if f.endswith('.txt')])
-        current_index = files.index(os.path.basename(current_file_path))
-        if current_index + 1 < len(files):
-            return os.path.join(os.path.dirname(current_file_path), files[current_index + 1])
-        return None
+    def build_page_index(self, ocr_output_folder):
+        '''List the OCR text files in natural page order, so page_2.txt comes before page_10.txt.'''
+        def natural_key(file_name):
+            return [int(part) if part.isdigit() else part.lower() for part in re.split(r'(\d+)', file_name)]
+
+        text_files = sorted((f for f in os.listdir(ocr_output_folder) if f.endswith('.txt')), key=natural_key)
+        return [os.path.join(ocr_output_folder, text_file) for text_file in text_files]
@@ -0,0 +1,86 @@
+import json #Built-in for Python 3.12.6
+import hashlib #Built-in for Python 3.12.6
+import threading #Built-in for Python 3.12.6
+
+def hash_bytes(data):
+    return hashlib.sha256(data).hexdigest()
+
+def hash_text(text):
+    '''Hash text as it reads back from a text file, so newline translation does not matter.'''
+    return hash_bytes(text.encode('utf-8'))
+
+def hash_file(path, text=False):
+    '''Return the hash of a file's content, or None if it does not exist.'''
+    try:
+        if text:
+            with open(path, 'r', encoding='utf-8') as file:
+                return hash_text(file.read())
+        with open(path, 'rb') as file:
+            return hash_bytes(file.read())
+    except OSError:
+        return None
+
+class PageManifest:
+    '''Journal of the processing stages completed for each page of a book.
+
+    Every completed stage is appended to the manifest file as one JSON line holding the page
+    key, the stage name and the content hashes of what the stage produced, so an interrupted
+    run loses at most the line being written. The first line describes the source PDF and the
+    settings; when they no longer match, the journal is discarded and the book starts over.
+    '''
+
+    def __init__(self, path, source):
+        self.path = path
+        self.lock = threading.Lock()
+        self.records = {}
+
+        if self.load() != source:
+            # The PDF or the settings changed since the last run, so nothing can be reused
+            self.records = {}
+            with open(path, 'w', encoding='utf-8') as manifest_file:
+                manifest_file.write(json.dumps({'source': source}) + '\n')
+
+        self.manifest_file = open(path, 'a', encoding='utf-8')
+
+    def load(self):
+        '''Read the journal, returning the source it was written for.'''
+        try:
+            with open(self.path, 'r', encoding='utf-8') as manifest_file:
+                lines = manifest_file.read().splitlines()
+        except OSError:
+            return None
+
+        try:
+            source = json.loads(lines[0])['source']
+        except (IndexError, ValueError, KeyError, TypeError):
+            return None
+
+        for line in lines[1:]:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # A line cut short by a crash; the stage is simply redone
+                continue
+            self.records[(record['page'], record['stage'])] = record
+        return source
+
+    def get(self, page, stage):
+        '''Return the record of the stage for the page, or None if it never completed.'''
+        return self.records.get((page, stage))
+
+    def record(self, page, stage, **hashes):
+        '''Append a completed stage for the page together with the hashes of its output.'''
+        record = dict(page=page, stage=stage, **hashes)
+        with self.lock:
+            self.records[(page, stage)] = record
+            self.manifest_file.write(json.dumps(record) + '\n')
+            self.manifest_file.flush()
+
+    def close(self):
+        self.manifest_file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,167 @@
+import os #Built-in for Python 3.12.6
+import json #Built-in for Python 3.12.6
+import time #Built-in for Python 3.12.6
+import threading #Built-in for Python 3.12.6
+from contextlib import contextmanager #Built-in for Python 3.12.6
+
+try:
+    import psutil #Bundled with Calibre
+except ImportError:
+    psutil = None
+
+# The metrics of the conversion running on each thread, so hooks called deep in pdf2image and pytesseract find it
+_active = threading.local()
+
+def active_metrics():
+    return getattr(_active, 'metrics', None)
+
+@contextmanager
+def stage(name):
+    '''Time the block as part of the named stage of the metrics active on this thread, if any.
+
+    Yields a dict whose 'bytes' entry the block can increase by the amount of data it wrote.
+    '''
+    metrics = active_metrics()
+    if metrics is None:
+        yield {'bytes': 0}
+    else:
+        with metrics.stage(name) as record:
+            yield record
+
+def watch_process(args, proc):
+    '''Process hook for pdf2image and pytesseract, reporting the process to the active metrics.'''
+    metrics = active_metrics()
+    if metrics is None:
+        return lambda output_bytes: None
+    return metrics.watch_process(args, proc)
+
+class Metrics:
+    '''Time, bytes, CPU and memory used by each stage and each external process of a conversion.
+
+    Stages are timed with stage() and summed per name, over every thread that ran them, so the
+    OCR time of several workers can exceed the wall time. External processes are reported by the
+    process hooks of pdf2image and pytesseract. While the metrics are entered, a sampler thread
+    records the peak memory and CPU time of those processes and the peak memory of Calibre itself;
+    this needs psutil, and those values are left out without it.
+    '''
+
+    def __init__(self, interval=0.02):
+        self.interval = interval
+        self.lock = threading.Lock()
+        self.stages = {}
+        self.processes = {}
+        self.watched = {}
+        self.peak_rss = None
+        self.sampler = None
+        self.stopped = threading.Event()
+        self.start_time = time.perf_counter()
+
+    def __enter__(self):
+        if psutil is not None:
+            self.sampler = threading.Thread(target=self.sample, daemon=True)
+            self.sampler.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.sampler is not None:
+            self.stopped.set()
+            self.sampler.join()
+
+    @contextmanager
+    def activate(self):
+        '''Make these the metrics that stage() and the process hooks report to on this thread.'''
+        previous = active_metrics()
+        _active.metrics = self
+        try:
+            yield self
+        finally:
+            _active.metrics = previous
+
+    @contextmanager
+    def stage(self, name):
+        record = {'bytes': 0}
+        start_time = time.perf_counter()
+        try:
+            yield record
+        finally:
+            self.add(self.stages, name, seconds=time.perf_counter() - start_time, bytes=record['bytes'])
+
+    def add(self, table, name, **values):
+        '''Add the values to the totals of the named entry, keeping the largest peak memory seen.'''
+        with self.lock:
+            entry = table.setdefault(name, {'count': 0})
+            entry['count'] += 1
+            for key, value in values.items():
+                if value is None:
+                    continue
+                if key.startswith('peak_'):
+                    entry[key] = max(entry.get(key, 0), value)
+                else:
+                    entry[key] = entry.get(key, 0) + value
+
+    def watch_process(self, args, proc):
+        '''Start measuring a process, returning the function to call with its output size once it ends.'''
+        name = os.path.splitext(os.path.basename(args[0]))[0]
+        start_time = time.perf_counter()
+        usage = {'cpu_seconds': None, 'peak_memory_bytes': None}
+        if psutil is not None:
+            try:
+                with self.lock:
+                    self.watched[proc.pid] = (psutil.Process(proc.pid), usage)
+            except psutil.Error:
+                pass
+
+        def done(output_bytes):
+            with self.lock:
+                self.watched.pop(proc.pid, None)
+            self.add(self.processes, name, seconds=time.perf_counter() - start_time, bytes=output_bytes,
+                     **usage)
+        return done
+
+    def sample(self):
+        '''Poll the memory and CPU use of Calibre and of the watched processes until the metrics exit.'''
+        this_process = psutil.Process()
+        while not self.stopped.wait(self.interval):
+            try:
+                self.peak_rss = max(self.peak_rss or 0, this_process.memory_info().rss)
+            except psutil.Error:
+                pass
+
+            with self.lock:
+                watched = list(self.watched.values())
+            for process, usage in watched:
+                try:
+                    with process.oneshot():
+                        memory = process.memory_info()
+                        cpu = process.cpu_times()
+                except psutil.Error:
+                    # The process ended between two samples; its last sample stands
+                    continue
+                # Windows reports the true peak working set, elsewhere the highest sample is the estimate
+                peak = getattr(memory, 'peak_wset', memory.rss)
+                usage['peak_memory_bytes'] = max(usage['peak_memory_bytes'] or 0, peak)
+                usage['cpu_seconds'] = cpu.user + cpu.system
+
+    def as_dict(self):
+        with self.lock:
+            return {
+                'seconds': time.perf_counter() - self.start_time,
+                'peak_rss_bytes': self.peak_rss,
+                'stages': {name: dict(entry) for name, entry in self.stages.items()},
+                'processes': {name: dict(entry) for name, entry in self.processes.items()},
+            }
+
+    def save(self, path):
+        with open(path, 'w', encoding='utf-8') as metrics_file:
+            json.dump(self.as_dict(), metrics_file, indent=2)
+
+    def summary(self):
+        '''Return a one-line summary of where the time went, for the status message.'''
+        metrics = self.as_dict()
+        parts = [f'{name} {entry["seconds"]:.1f}s' for name, entry in metrics['stages'].items()]
+        for name, entry in metrics['processes'].items():
+            part = f'{entry["count"]} {name} runs {entry["seconds"]:.1f}s'
+            if 'cpu_seconds' in entry:
+                part += f' ({entry["cpu_seconds"]:.1f}s CPU)'
+            parts.append(part)
+        return f'Total {metrics["seconds"]:.1f}s: ' + ', '.join(parts)
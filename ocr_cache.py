@@ -0,0 +1,79 @@
+import os #Built-in for Python 3.12.6
+import hashlib #Built-in for Python 3.12.6
+import tempfile #Built-in for Python 3.12.6
+import threading #Built-in for Python 3.12.6
+
+class OCRCache:
+    '''On-disk cache of OCR text keyed by page image content and the Tesseract settings used.
+
+    Entries are plain text files under <cache_folder>/<key[:2]>/<key>.txt. The modification time
+    of an entry is bumped on every hit, and the least recently used entries are evicted once the
+    total size goes over max_size bytes.
+    '''
+
+    def __init__(self, cache_folder, max_size):
+        self.cache_folder = cache_folder
+        self.max_size = max_size
+        self.lock = threading.Lock()
+        os.makedirs(cache_folder, exist_ok=True)
+
+        # Measure the cache once; entries added afterwards are counted as they are written
+        self.total_size = sum(size for _, size, _ in self.entries())
+
+    def key(self, image_hash, tesseract_version, lang, config):
+        '''Return the cache key for the hash of the encoded page image and the Tesseract settings.'''
+        return hashlib.sha256(f'{image_hash}\0{tesseract_version}\0{lang}\0{config}'.encode('utf-8')).hexdigest()
+
+    def entry_path(self, key):
+        return os.path.join(self.cache_folder, key[:2], f'{key}.txt')
+
+    def get(self, key):
+        '''Return the cached text for the key, or None if the page has not been OCR'd yet.'''
+        entry_path = self.entry_path(key)
+        try:
+            with open(entry_path, 'r', encoding='utf-8') as entry:
+                text = entry.read()
+            # Mark the entry as recently used
+            os.utime(entry_path)
+            return text
+        except OSError:
+            return None
+
+    def put(self, key, text):
+        '''Store the text for the key, evicting the least recently used entries if the cache is full.'''
+        entry_path = self.entry_path(key)
+        os.makedirs(os.path.dirname(entry_path), exist_ok=True)
+
+        # Write to a temporary file first so readers never see a partial entry
+        fd, temp_path = tempfile.mkstemp(suffix='.tmp', dir=os.path.dirname(entry_path))
+        with os.fdopen(fd, 'w', encoding='utf-8') as entry:
+            entry.write(text)
+        size = os.path.getsize(temp_path)
+        os.replace(temp_path, entry_path)
+
+        with self.lock:
+            self.total_size += size
+            if self.total_size > self.max_size:
+                self.evict()
+
+    def entries(self):
+        '''Yield (path, size, last used time) for every entry in the cache.'''
+        for bucket in os.scandir(self.cache_folder):
+            if bucket.is_dir():
+                for entry in os.scandir(bucket.path):
+                    if entry.name.endswith('.txt'):
+                        stat = entry.stat()
+                        yield entry.path, stat.st_size, stat.st_mtime
+
+    def evict(self):
+        '''Remove the least recently used entries until the cache is back to 90% of its size limit.'''
+        entries = sorted(self.entries(), key=lambda entry: entry[2])
+        self.total_size = sum(size for _, size, _ in entries)
+        for entry_path, size, _ in entries:
+            if self.total_size <= 0.9 * self.max_size:
+                break
+            try:
+                os.remove(entry_path)
+                self.total_size -= size
+            except OSError:
+                pass
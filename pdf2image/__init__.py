@@ -4,5 +4,6 @@
 
 from .pdf2image import convert_from_bytes as convert_from_bytes
 from .pdf2image import convert_from_path as convert_from_path
+from .pdf2image import convert_from_path_iter as convert_from_path_iter
 from .pdf2image import pdfinfo_from_bytes as pdfinfo_from_bytes
 from .pdf2image import pdfinfo_from_path as pdfinfo_from_path
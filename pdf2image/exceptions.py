@@ -31,3 +31,9 @@ class PDFPopplerTimeoutError(Exception):
     """Raised when the timeout is exceeded while converting a PDF"""
 
     pass
+
+
+class PDFPopplerError(Exception):
+    """Raised when poppler exits with an error while rendering"""
+
+    pass
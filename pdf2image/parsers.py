@@ -2,11 +2,62 @@
     pdf2image custom buffer parsers
 """
 
-from io import BytesIO
-from typing import List
+import re
+from io import BytesIO, RawIOBase, SEEK_SET, SEEK_CUR, SEEK_END
+from typing import BinaryIO, Iterator, List
 
 from PIL import Image
 
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+# Magic number, width and height of a binary netpbm header, and the maxval that follows in PGM and PPM
+_PNM_HEADER = re.compile(rb"(P[456])\s+(\d+)\s+(\d+)\s")
+_PNM_MAXVAL = re.compile(rb"(\d+)\s")
+
+# Image mode, raw decoder mode and bytes per row of width pixels for each netpbm format
+_PNM_FORMATS = {
+    b"P4": ("1", "1;I", lambda width: (width + 7) // 8),
+    b"P5": ("L", "L", lambda width: width),
+    b"P6": ("RGB", "RGB", lambda width: 3 * width),
+}
+
+
+class _BufferReader(RawIOBase):
+    """Read-only file object over part of a buffer, so Pillow can open an image without a copy of it"""
+
+    def __init__(self, buffer, start: int = 0, end: int = None):
+        self._view = memoryview(buffer)[start:end]
+        self._position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def read(self, size: int = -1) -> bytes:
+        end = len(self._view) if size is None or size < 0 else self._position + size
+        chunk = self._view[self._position : end].tobytes()
+        self._position += len(chunk)
+        return chunk
+
+    def readinto(self, buffer) -> int:
+        chunk = self._view[self._position : self._position + len(buffer)]
+        buffer[: len(chunk)] = chunk
+        self._position += len(chunk)
+        return len(chunk)
+
+    def seek(self, offset: int, whence: int = SEEK_SET) -> int:
+        if whence == SEEK_CUR:
+            offset += self._position
+        elif whence == SEEK_END:
+            offset += len(self._view)
+        self._position = max(0, offset)
+        return self._position
+
+    def tell(self) -> int:
+        return self._position
+
 
 def parse_buffer_to_ppm(data: bytes) -> List[Image.Image]:
     """Parse PPM file bytes to Pillow Image
@@ -17,18 +68,7 @@ def parse_buffer_to_ppm(data: bytes) -> List[Image.Image]:
     :rtype: List[Image.Image]
     """
 
-    images = []
-
-    index = 0
-
-    while index < len(data):
-        code, size, rgb = tuple(data[index : index + 40].split(b"\n")[0:3])
-        size_x, size_y = tuple(size.split(b" "))
-        file_size = len(code) + len(size) + len(rgb) + 3 + int(size_x) * int(size_y) * 3
-        images.append(Image.open(BytesIO(data[index : index + file_size])))
-        index += file_size
-
-    return images
+    return _parse_buffer_to_pnm(data)
 
 
 def parse_buffer_to_pgm(data: bytes) -> List[Image.Image]:
@@ -40,20 +80,105 @@ def parse_buffer_to_pgm(data: bytes) -> List[Image.Image]:
     :rtype: List[Image.Image]
     """
 
+    return _parse_buffer_to_pnm(data)
+
+
+def parse_buffer_to_pbm(data: bytes) -> List[Image.Image]:
+    """Parse PBM file bytes to Pillow Image
+
+    :param data: pdftoppm/pdftocairo output bytes
+    :type data: bytes
+    :return: List of PBM images parsed from the output
+    :rtype: List[Image.Image]
+    """
+
+    return _parse_buffer_to_pnm(data)
+
+
+def _parse_buffer_to_pnm(data: bytes) -> List[Image.Image]:
+    """Parse concatenated binary PBM/PGM/PPM file bytes to Pillow Images
+
+    The headers are read in place and the pixels are wrapped with Image.frombuffer over a
+    memoryview of the output, so grayscale pages share the output buffer instead of being
+    copied, and color and black and white pages are copied once, straight into the image.
+
+    :param data: pdftoppm/pdftocairo output bytes
+    :type data: bytes
+    :return: List of images parsed from the output
+    :rtype: List[Image.Image]
+    """
+
     images = []
 
+    view = memoryview(data)
     index = 0
-
     while index < len(data):
-        code, size, maxval = tuple(data[index : index + 40].split(b"\n")[0:3])
-        size_x, size_y = tuple(size.split(b" "))
-        file_size = len(code) + len(size) + len(maxval) + 3 + int(size_x) * int(size_y)
-        images.append(Image.open(BytesIO(data[index : index + file_size])))
-        index += file_size
+        header = _PNM_HEADER.match(data, index)
+        magic, width, height = header.group(1), int(header.group(2)), int(header.group(3))
+        mode, rawmode, bytes_per_row = _PNM_FORMATS[magic]
+        pixels_start = header.end()
+        maxval = 1
+
+        if magic != b"P4":
+            maxval_header = _PNM_MAXVAL.match(data, pixels_start)
+            maxval = int(maxval_header.group(1))
+            pixels_start = maxval_header.end()
+
+        if maxval > 255:
+            # 16-bit samples are left to Pillow's own decoder
+            pixels_end = pixels_start + 2 * bytes_per_row(width) * height
+            images.append(Image.open(_BufferReader(data, index, pixels_end)))
+        else:
+            pixels_end = pixels_start + bytes_per_row(width) * height
+            images.append(
+                Image.frombuffer(
+                    mode,
+                    (width, height),
+                    view[pixels_start:pixels_end],
+                    "raw",
+                    rawmode,
+                    0,
+                    1,
+                )
+            )
+        index = pixels_end
 
     return images
 
 
+def parse_stream_to_pnm(stream: BinaryIO) -> Iterator[Image.Image]:
+    """Parse binary PBM/PGM/PPM images from a stream as each one is complete
+
+    Headers are expected as pdftoppm writes them, with a newline after every field line.
+
+    :param stream: pdftoppm stdout, or any binary file object
+    :type stream: BinaryIO
+    :return: Iterator over the images, ending at the end of the stream or on a truncated image
+    :rtype: Iterator[Image.Image]
+    """
+
+    while True:
+        fields = stream.readline().split()
+        if not fields:
+            return
+        while len(fields) < (3 if fields[0] == b"P4" else 4):
+            line = stream.readline()
+            if not line:
+                return
+            fields += line.split()
+
+        width, height = int(fields[1]), int(fields[2])
+        mode, rawmode, bytes_per_row = _PNM_FORMATS[fields[0]]
+        if fields[0] != b"P4" and int(fields[3]) > 255:
+            raise ValueError("Only 8-bit PGM/PPM images can be read from a stream")
+
+        pixels_size = bytes_per_row(width) * height
+        pixels = stream.read(pixels_size)
+        if len(pixels) < pixels_size:
+            return
+        yield Image.frombuffer(mode, (width, height), pixels, "raw", rawmode, 0, 1)
+
+
 def parse_buffer_to_jpeg(data: bytes) -> List[Image.Image]:
     """Parse JPEG file bytes to Pillow Image
 
@@ -74,6 +199,9 @@ def parse_buffer_to_jpeg(data: bytes) -> List[Image.Image]:
 def parse_buffer_to_png(data: bytes) -> List[Image.Image]:
     """Parse PNG file bytes to Pillow Image
 
+    The stream is split by walking the chunks of each PNG by their length fields up to
+    its IEND chunk, and each image is read straight from the stream without being copied.
+
     :param data: pdftoppm/pdftocairo output bytes
     :type data: bytes
     :return: List of PNG images parsed from the output
@@ -82,17 +210,18 @@ def parse_buffer_to_png(data: bytes) -> List[Image.Image]:
 
     images = []
 
-    c1 = 0
-    c2 = 0
+    start = 0
     data_len = len(data)
-    while c1 < data_len:
-        # IEND can appear in a PNG without being the actual end
-        if data[c2 : c2 + 4] == b"IEND" and (
-            c2 + 8 == data_len or data[c2 + 9 : c2 + 12] == b"PNG"
-        ):
-            images.append(Image.open(BytesIO(data[c1 : c2 + 8])))
-            c1 = c2 + 8
-            c2 = c1
-        c2 += 1
+    while start < data_len:
+        index = start + len(PNG_SIGNATURE)
+        while index < data_len:
+            # Every chunk is a 4-byte length, a 4-byte type, the data and a 4-byte CRC
+            length = int.from_bytes(data[index : index + 4], "big")
+            chunk_type = data[index + 4 : index + 8]
+            index += 12 + length
+            if chunk_type == b"IEND":
+                break
+        images.append(Image.open(_BufferReader(data, start, index)))
+        start = index
 
     return images
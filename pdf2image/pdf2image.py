@@ -9,18 +9,23 @@ import tempfile
 import types
 import shutil
 import subprocess
+import threading
+import time
+from collections import OrderedDict
 from subprocess import Popen, PIPE, TimeoutExpired
-from typing import Any, Union, Tuple, List, Dict, Callable
+from typing import Any, Union, Tuple, List, Dict, Callable, Iterator
 from pathlib import PurePath
 from PIL import Image
 
 from pdf2image.generators import uuid_generator, counter_generator, ThreadSafeGenerator
 
 from pdf2image.parsers import (
+    parse_buffer_to_pbm,
     parse_buffer_to_pgm,
     parse_buffer_to_ppm,
     parse_buffer_to_jpeg,
     parse_buffer_to_png,
+    parse_stream_to_pnm,
 )
 
 from pdf2image.exceptions import (
@@ -28,11 +33,65 @@ from pdf2image.exceptions import (
     PDFPageCountError,
     PDFSyntaxError,
     PDFPopplerTimeoutError,
+    PDFPopplerError,
 )
 
 TRANSPARENT_FILE_TYPES = ["png", "tiff"]
 PDFINFO_CONVERT_TO_INT = ["Pages"]
 
+# Bits per pixel of the image modes poppler's PPM/PGM/PBM output is parsed to
+_PIXEL_BITS = {"1": 1, "L": 8, "RGB": 24}
+
+# Optional callable, called as process_hook(args, process) whenever a poppler process is
+# started. It returns a function that is called with the size of the process output once
+# the process has ended, which lets callers measure every poppler run.
+process_hook = None
+
+
+class _FileCache:
+    """Bounded, thread-safe cache of results that depend on the content of a file
+
+    Entries are keyed by the file's path, size and modification time, so a file that
+    changes gets a new key, together with any arguments the result depends on.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self._entries = OrderedDict()
+        self._max_entries = max_entries
+        self._lock = threading.Lock()
+
+    def key(self, path: str, *args) -> Tuple:
+        """Return the key for the file and arguments, or None if the file can't be found"""
+        try:
+            stat = os.stat(path)
+        except (OSError, TypeError, ValueError):
+            return None
+        return (os.path.abspath(path), stat.st_size, stat.st_mtime_ns) + args
+
+    def get(self, key: Tuple) -> Any:
+        if key is None:
+            return None
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def put(self, key: Tuple, value: Any):
+        if key is None:
+            return
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+
+# Poppler versions keyed by binary, and pdfinfo results keyed by PDF, reused across calls
+# since every poppler process start can cost 100+ ms on Windows
+_poppler_version_cache = _FileCache()
+_pdfinfo_cache = _FileCache()
+
 
 def convert_from_path(
     pdf_path: Union[str, PurePath],
@@ -57,6 +116,9 @@ def convert_from_path(
     use_pdftocairo: bool = False,
     timeout: int = None,
     hide_annotations: bool = False,
+    pages: List[int] = None,
+    monochrome: bool = False,
+    crop: Tuple[int, int, int, int] = None,
 ) -> List[Image.Image]:
     """Function wrapping pdftoppm and pdftocairo
 
@@ -74,7 +136,7 @@ def convert_from_path(
     :type fmt: str, optional
     :param jpegopt: jpeg options `quality`, `progressive`, and `optimize` (only for jpeg format), defaults to None
     :type jpegopt: Dict, optional
-    :param thread_count: How many threads we are allowed to spawn for processing, defaults to 1
+    :param thread_count: How many poppler processes may run at once; pages are handed out to them in small chunks as they finish, defaults to 1
     :type thread_count: int, optional
     :param userpw: PDF's password, defaults to None
     :type userpw: str, optional
@@ -104,6 +166,12 @@ def convert_from_path(
     :type timeout: int, optional
     :param hide_annotations: Hide PDF annotations in the output, defaults to False
     :type hide_annotations: bool, optional
+    :param pages: Only render these page numbers (within first_page and last_page), defaults to None
+    :type pages: List[int], optional
+    :param monochrome: Output 1-bit black and white image(s) instead of color or grayscale, defaults to False
+    :type monochrome: bool, optional
+    :param crop: Only render the (x, y, width, height) rectangle of each page, in pixels of the rendered page, defaults to None
+    :type crop: Tuple[int, int, int, int], optional
     :raises NotImplementedError: Raised when conflicting parameters are given (hide_annotations for pdftocairo)
     :raises PDFPopplerTimeoutError: Raised after the timeout for the image processing is exceeded
     :raises PDFSyntaxError: Raised if there is a syntax error in the PDF and strict=True
@@ -128,9 +196,12 @@ def convert_from_path(
         pdf_path, userpw, ownerpw, poppler_path=poppler_path
     )["Pages"]
 
+    # PDF bytes from convert_from_bytes are piped to every poppler process instead of read from a file
+    pdf_path, pdf_data = _get_pdf_input(pdf_path)
+
     # We start by getting the output format, the buffer processing function and if we need pdftocairo
     parsed_fmt, final_extension, parse_buffer_func, use_pdfcairo_format = _parse_format(
-        fmt, grayscale
+        fmt, grayscale, monochrome
     )
 
     # We use pdftocairo is the format requires it OR we need a transparent output
@@ -163,110 +234,123 @@ def convert_from_path(
     if thread_count < 1:
         thread_count = 1
 
-    if first_page is None or first_page < 1:
-        first_page = 1
-
-    if last_page is None or last_page > page_count:
-        last_page = page_count
-
-    if first_page > last_page:
+    pages = _select_pages(page_count, first_page, last_page, pages)
+    if not pages:
         return []
 
+    if single_file:
+        # -singlefile only ever writes the first page
+        pages = pages[:1]
+
     try:
         auto_temp_dir = False
         if output_folder is None and use_pdfcairo:
             output_folder = tempfile.mkdtemp()
             auto_temp_dir = True
 
-        # Recalculate page count based on first and last page
-        page_count = last_page - first_page + 1
+        # Poppler pads the page numbers in file names to the digits of the document's page count
+        page_digits = len(str(page_count))
+
+        # Recalculate page count based on the selected pages
+        page_count = len(pages)
 
         if thread_count > page_count:
             thread_count = page_count
 
-        reminder = page_count % thread_count
-        current_page = first_page
-        processes = []
-        for _ in range(thread_count):
-            thread_output_file = next(output_file)
+        if use_pdfcairo and hide_annotations:
+            raise NotImplementedError(
+                "Hide annotations flag not implemented in pdftocairo."
+            )
+
+        # Add poppler path to LD_LIBRARY_PATH
+        env = os.environ.copy()
+        if poppler_path is not None:
+            env["LD_LIBRARY_PATH"] = poppler_path + ":" + env.get("LD_LIBRARY_PATH", "")
+
+        startupinfo = None
+        if platform.system() == "Windows":
+            # this startupinfo structure prevents a console window from popping up on Windows
+            startupinfo = subprocess.STARTUPINFO()
+            startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+
+        output_file_lock = threading.Lock()
+
+        def render_run(run_first_page, run_last_page, page_parity):
+            """Render a run of evenly spaced pages with one poppler process and return its images"""
+            # Workers share the output file generator, which is not thread-safe
+            with output_file_lock:
+                run_output_file = next(output_file)
 
-            # Get the number of pages the thread will be processing
-            thread_page_count = page_count // thread_count + int(reminder > 0)
             # Build the command accordingly
             args = _build_command(
                 ["-r", str(dpi), pdf_path],
                 output_folder,
-                current_page,
-                current_page + thread_page_count - 1,
+                run_first_page,
+                run_last_page,
                 parsed_fmt,
                 jpegopt,
-                thread_output_file,
+                run_output_file,
                 userpw,
                 ownerpw,
                 use_cropbox,
                 transparent,
                 single_file,
                 grayscale,
+                monochrome,
                 size,
                 hide_annotations,
+                page_parity,
+                crop,
             )
-
-            if use_pdfcairo:
-                if hide_annotations:
-                    raise NotImplementedError(
-                        "Hide annotations flag not implemented in pdftocairo."
-                    )
-                args = [_get_command_path("pdftocairo", poppler_path)] + args
-            else:
-                args = [_get_command_path("pdftoppm", poppler_path)] + args
-
-            # Update page values
-            current_page = current_page + thread_page_count
-            reminder -= int(reminder > 0)
-            # Add poppler path to LD_LIBRARY_PATH
-            env = os.environ.copy()
-            if poppler_path is not None:
-                env["LD_LIBRARY_PATH"] = (
-                    poppler_path + ":" + env.get("LD_LIBRARY_PATH", "")
-                )
-            # Spawn the process and save its uuid
-            startupinfo = None
-            if platform.system() == "Windows":
-                # this startupinfo structure prevents a console window from popping up on Windows
-                startupinfo = subprocess.STARTUPINFO()
-                startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
-            processes.append(
-                (
-                    thread_output_file,
-                    Popen(
-                        args, env=env, stdout=PIPE, stderr=PIPE, startupinfo=startupinfo
-                    ),
-                )
+            command = "pdftocairo" if use_pdfcairo else "pdftoppm"
+            args = [_get_command_path(command, poppler_path)] + args
+
+            proc = Popen(
+                args,
+                env=env,
+                stdin=None if pdf_data is None else PIPE,
+                stdout=PIPE,
+                stderr=PIPE,
+                startupinfo=startupinfo,
             )
+            if pdf_data is not None:
+                _feed_stdin(proc, pdf_data)
+            process_done = _watch_process(args, proc)
 
-        images = []
-
-        for uid, proc in processes:
             try:
                 data, err = proc.communicate(timeout=timeout)
             except TimeoutExpired:
                 proc.kill()
                 outs, errs = proc.communicate()
                 raise PDFPopplerTimeoutError("Run poppler timeout.")
+            process_done(len(data))
 
             if b"Syntax Error" in err and strict:
                 raise PDFSyntaxError(err.decode("utf8", "ignore"))
 
             if output_folder is not None:
-                images += _load_from_output_folder(
+                run_pages = range(run_first_page, run_last_page + 1, 1 if page_parity is None else 2)
+                return _load_from_output_folder(
                     output_folder,
-                    uid,
+                    run_output_file,
                     final_extension,
                     paths_only,
                     in_memory=auto_temp_dir,
+                    file_names=_get_output_file_names(
+                        run_output_file, final_extension, run_pages, page_digits, single_file
+                    ),
                 )
-            else:
-                images += parse_buffer_func(data)
+            return parse_buffer_func(data)
+
+        def render_chunk(chunk_pages):
+            # Every run of evenly spaced pages is rendered by a single poppler process
+            return [
+                image
+                for run in _get_page_runs(chunk_pages)
+                for image in render_run(*run)
+            ]
+
+        images = _PageScheduler(pages, thread_count).run(render_chunk)
     finally:
         if auto_temp_dir:
             shutil.rmtree(output_folder)
@@ -274,6 +358,182 @@ def convert_from_path(
     return images
 
 
+def convert_from_path_iter(
+    pdf_path: Union[str, PurePath],
+    dpi: int = 200,
+    first_page: int = None,
+    last_page: int = None,
+    userpw: str = None,
+    ownerpw: str = None,
+    use_cropbox: bool = False,
+    strict: bool = False,
+    poppler_path: Union[str, PurePath] = None,
+    grayscale: bool = False,
+    size: Union[Tuple, int] = None,
+    timeout: int = None,
+    hide_annotations: bool = False,
+    pages: List[int] = None,
+    monochrome: bool = False,
+    crop: Tuple[int, int, int, int] = None,
+) -> Iterator[Image.Image]:
+    """Generator wrapping pdftoppm that yields each page as soon as poppler has rendered it
+
+    Poppler's output is read incrementally instead of being collected in full, so the
+    caller can process a page while the next one renders, and memory use is bounded by
+    about two pages whatever the number of pages. Pages are yielded in page order as
+    PPM, or PGM/PBM with grayscale/monochrome, images.
+
+    :param pdf_path: Path to the PDF that you want to convert
+    :type pdf_path: Union[str, PurePath]
+    :param dpi: Image quality in DPI, defaults to 200
+    :type dpi: int, optional
+    :param first_page: First page to process, defaults to None
+    :type first_page: int, optional
+    :param last_page: Last page to process before stopping, defaults to None
+    :type last_page: int, optional
+    :param userpw: PDF's password, defaults to None
+    :type userpw: str, optional
+    :param ownerpw: PDF's owner password, defaults to None
+    :type ownerpw: str, optional
+    :param use_cropbox: Use cropbox instead of mediabox, defaults to False
+    :type use_cropbox: bool, optional
+    :param strict: When a Syntax Error is thrown, it will be raised as an Exception, defaults to False
+    :type strict: bool, optional
+    :param poppler_path: Path to look for poppler binaries, defaults to None
+    :type poppler_path: Union[str, PurePath], optional
+    :param grayscale: Output grayscale image(s), defaults to False
+    :type grayscale: bool, optional
+    :param size: Size of the resulting image(s), uses the Pillow (width, height) standard, defaults to None
+    :type size: Union[Tuple, int], optional
+    :param timeout: Raise PDFPopplerTimeoutError after the given time, for each poppler process, defaults to None
+    :type timeout: int, optional
+    :param hide_annotations: Hide PDF annotations in the output, defaults to False
+    :type hide_annotations: bool, optional
+    :param pages: Only render these page numbers (within first_page and last_page), defaults to None
+    :type pages: List[int], optional
+    :param monochrome: Output 1-bit black and white image(s) instead of color or grayscale, defaults to False
+    :type monochrome: bool, optional
+    :param crop: Only render the (x, y, width, height) rectangle of each page, in pixels of the rendered page, defaults to None
+    :type crop: Tuple[int, int, int, int], optional
+    :raises PDFPopplerTimeoutError: Raised after the timeout for the image processing is exceeded
+    :raises PDFSyntaxError: Raised if there is a syntax error in the PDF and strict=True, after the pages of the poppler process that reported it
+    :raises PDFPopplerError: Raised if a poppler process exits with an error, after the pages it rendered, with its error output
+    :return: Iterator over the PIL images of the pages
+    :rtype: Iterator[Image.Image]
+    """
+
+    if isinstance(pdf_path, PurePath):
+        pdf_path = pdf_path.as_posix()
+
+    if isinstance(poppler_path, PurePath):
+        poppler_path = poppler_path.as_posix()
+
+    page_count = pdfinfo_from_path(
+        pdf_path, userpw, ownerpw, poppler_path=poppler_path
+    )["Pages"]
+
+    pdf_path, pdf_data = _get_pdf_input(pdf_path)
+
+    parsed_fmt = _parse_format("ppm", grayscale, monochrome)[0]
+
+    poppler_version_major, poppler_version_minor = _get_poppler_version(
+        "pdftoppm", poppler_path=poppler_path
+    )
+
+    if poppler_version_major == 0 and poppler_version_minor <= 83:
+        hide_annotations = False
+
+    env = os.environ.copy()
+    if poppler_path is not None:
+        env["LD_LIBRARY_PATH"] = poppler_path + ":" + env.get("LD_LIBRARY_PATH", "")
+    startupinfo = None
+    if platform.system() == "Windows":
+        # this startupinfo structure prevents a console window from popping up on Windows
+        startupinfo = subprocess.STARTUPINFO()
+        startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+
+    # The runs are rendered one after the other, so pages come out in order
+    for run_first_page, run_last_page, page_parity in _get_page_runs(
+        _select_pages(page_count, first_page, last_page, pages)
+    ):
+        args = [_get_command_path("pdftoppm", poppler_path)] + _build_command(
+            ["-r", str(dpi), pdf_path],
+            None,
+            run_first_page,
+            run_last_page,
+            parsed_fmt,
+            None,
+            None,
+            userpw,
+            ownerpw,
+            use_cropbox,
+            False,
+            False,
+            grayscale,
+            monochrome,
+            size,
+            hide_annotations,
+            page_parity,
+            crop,
+        )
+
+        # stderr goes to a file, as a full stderr pipe would stall poppler while its stdout is read
+        with tempfile.TemporaryFile() as stderr_file:
+            proc = Popen(
+                args,
+                env=env,
+                stdin=None if pdf_data is None else PIPE,
+                stdout=PIPE,
+                stderr=stderr_file,
+                startupinfo=startupinfo,
+            )
+            if pdf_data is not None:
+                _feed_stdin(proc, pdf_data)
+            process_done = _watch_process(args, proc)
+
+            # Reading blocks, so a timeout is enforced by killing the process
+            timed_out = threading.Event()
+            timer = None
+            if timeout:
+
+                def kill_on_timeout(proc=proc):
+                    timed_out.set()
+                    proc.kill()
+
+                timer = threading.Timer(timeout, kill_on_timeout)
+                timer.start()
+
+            output_bytes = 0
+            try:
+                for image in parse_stream_to_pnm(proc.stdout):
+                    output_bytes += (_PIXEL_BITS[image.mode] * image.width + 7) // 8 * image.height
+                    yield image
+                proc.wait()
+            finally:
+                if timer is not None:
+                    timer.cancel()
+                # The caller may stop early, which must not leave poppler running
+                if proc.poll() is None:
+                    proc.kill()
+                proc.stdout.close()
+                proc.wait()
+
+            if timed_out.is_set():
+                raise PDFPopplerTimeoutError("Run poppler timeout.")
+
+            process_done(output_bytes)
+
+            stderr_file.seek(0)
+            err = stderr_file.read().decode("utf8", "ignore")
+            # Otherwise a failed run would look like a shorter document
+            if proc.returncode != 0:
+                raise PDFPopplerError(
+                    f"pdftoppm exited with status {proc.returncode} on pages {run_first_page}-{run_last_page}: {err.strip()}"
+                )
+            if strict and "Syntax Error" in err:
+                raise PDFSyntaxError(err)
+
+
 def convert_from_bytes(
     pdf_file: bytes,
     dpi: int = 200,
@@ -297,6 +557,10 @@ def convert_from_bytes(
     use_pdftocairo: bool = False,
     timeout: int = None,
     hide_annotations: bool = False,
+    pages: List[int] = None,
+    monochrome: bool = False,
+    use_stdin: bool = False,
+    crop: Tuple[int, int, int, int] = None,
 ) -> List[Image.Image]:
     """Function wrapping pdftoppm and pdftocairo.
 
@@ -314,7 +578,7 @@ def convert_from_bytes(
     :type fmt: str, optional
     :param jpegopt: jpeg options `quality`, `progressive`, and `optimize` (only for jpeg format), defaults to None
     :type jpegopt: Dict, optional
-    :param thread_count: How many threads we are allowed to spawn for processing, defaults to 1
+    :param thread_count: How many poppler processes may run at once; pages are handed out to them in small chunks as they finish, defaults to 1
     :type thread_count: int, optional
     :param userpw: PDF's password, defaults to None
     :type userpw: str, optional
@@ -344,6 +608,14 @@ def convert_from_bytes(
     :type timeout: int, optional
     :param hide_annotations: Hide PDF annotations in the output, defaults to False
     :type hide_annotations: bool, optional
+    :param pages: Only render these page numbers (within first_page and last_page), defaults to None
+    :type pages: List[int], optional
+    :param monochrome: Output 1-bit black and white image(s) instead of color or grayscale, defaults to False
+    :type monochrome: bool, optional
+    :param use_stdin: Pipe the PDF to poppler's stdin instead of writing it to a temporary file, defaults to False
+    :type use_stdin: bool, optional
+    :param crop: Only render the (x, y, width, height) rectangle of each page, in pixels of the rendered page, defaults to None
+    :type crop: Tuple[int, int, int, int], optional
     :raises NotImplementedError: Raised when conflicting parameters are given (hide_annotations for pdftocairo)
     :raises PDFPopplerTimeoutError: Raised after the timeout for the image processing is exceeded
     :raises PDFSyntaxError: Raised if there is a syntax error in the PDF and strict=True
@@ -351,38 +623,47 @@ def convert_from_bytes(
     :rtype: List[Image.Image]
     """
 
-    fh, temp_filename = tempfile.mkstemp()
+    fh = None
+    if use_stdin:
+        pdf_path = _PipedPDF(pdf_file)
+    else:
+        fh, pdf_path = tempfile.mkstemp()
+
     try:
-        with open(temp_filename, "wb") as f:
-            f.write(pdf_file)
-            f.flush()
-            return convert_from_path(
-                f.name,
-                dpi=dpi,
-                output_folder=output_folder,
-                first_page=first_page,
-                last_page=last_page,
-                fmt=fmt,
-                jpegopt=jpegopt,
-                thread_count=thread_count,
-                userpw=userpw,
-                ownerpw=ownerpw,
-                use_cropbox=use_cropbox,
-                strict=strict,
-                transparent=transparent,
-                single_file=single_file,
-                output_file=output_file,
-                poppler_path=poppler_path,
-                grayscale=grayscale,
-                size=size,
-                paths_only=paths_only,
-                use_pdftocairo=use_pdftocairo,
-                timeout=timeout,
-                hide_annotations=hide_annotations,
-            )
+        if fh is not None:
+            with open(pdf_path, "wb") as f:
+                f.write(pdf_file)
+        return convert_from_path(
+            pdf_path,
+            dpi=dpi,
+            output_folder=output_folder,
+            first_page=first_page,
+            last_page=last_page,
+            fmt=fmt,
+            jpegopt=jpegopt,
+            thread_count=thread_count,
+            userpw=userpw,
+            ownerpw=ownerpw,
+            use_cropbox=use_cropbox,
+            strict=strict,
+            transparent=transparent,
+            single_file=single_file,
+            output_file=output_file,
+            poppler_path=poppler_path,
+            grayscale=grayscale,
+            monochrome=monochrome,
+            size=size,
+            paths_only=paths_only,
+            use_pdftocairo=use_pdftocairo,
+            timeout=timeout,
+            hide_annotations=hide_annotations,
+            pages=pages,
+            crop=crop,
+        )
     finally:
-        os.close(fh)
-        os.remove(temp_filename)
+        if fh is not None:
+            os.close(fh)
+            os.remove(pdf_path)
 
 
 def _build_command(
@@ -399,8 +680,11 @@ def _build_command(
     transparent: bool,
     single_file: bool,
     grayscale: bool,
+    monochrome: bool,
     size: Union[int, Tuple[int, int]],
     hide_annotations: bool,
+    page_parity: str = None,
+    crop: Tuple[int, int, int, int] = None,
 ) -> List[str]:
     if use_cropbox:
         args.append("-cropbox")
@@ -417,7 +701,16 @@ def _build_command(
     if last_page is not None:
         args.extend(["-l", str(last_page)])
 
-    if fmt not in ["pgm", "ppm"]:
+    if crop is not None:
+        x, y, width, height = crop
+        args.extend(["-x", str(int(x)), "-y", str(int(y)), "-W", str(int(width)), "-H", str(int(height))])
+
+    if page_parity == "odd":
+        args.append("-o")
+    elif page_parity == "even":
+        args.append("-e")
+
+    if fmt not in ["pbm", "pgm", "ppm"]:
         args.append("-" + fmt)
 
     if fmt in ["jpeg", "jpg"] and jpegopt:
@@ -435,7 +728,9 @@ def _build_command(
     if ownerpw is not None:
         args.extend(["-opw", ownerpw])
 
-    if grayscale:
+    if monochrome:
+        args.append("-mono")
+    elif grayscale:
         args.append("-gray")
 
     if size is None:
@@ -459,7 +754,41 @@ def _build_command(
     return args
 
 
-def _parse_format(fmt: str, grayscale: bool = False) -> Tuple[str, str, Callable, bool]:
+def _get_page_runs(pages: List[int]) -> List[Tuple[int, int, str]]:
+    """Group sorted page numbers into runs that one poppler call can render
+
+    A run is either consecutive pages, or every other page between its bounds, which
+    is rendered with -o/-e so poppler never rasterises the pages in between.
+
+    :param pages: Sorted, unique page numbers
+    :type pages: List[int]
+    :return: (first_page, last_page, parity) tuples, parity being None, "odd" or "even"
+    :rtype: List[Tuple[int, int, str]]
+    """
+
+    runs = []
+
+    index = 0
+    while index < len(pages):
+        first = pages[index]
+        end = index + 1
+        if end < len(pages) and pages[end] - first in (1, 2):
+            step = pages[end] - first
+            while end < len(pages) and pages[end] - pages[end - 1] == step:
+                end += 1
+        else:
+            step = 1
+        last = pages[end - 1]
+        parity = None if step == 1 or first == last else ("odd" if first % 2 else "even")
+        runs.append((first, last, parity))
+        index = end
+
+    return runs
+
+
+def _parse_format(
+    fmt: str, grayscale: bool = False, monochrome: bool = False
+) -> Tuple[str, str, Callable, bool]:
     fmt = fmt.lower()
     if fmt[0] == ".":
         fmt = fmt[1:]
@@ -469,6 +798,8 @@ def _parse_format(fmt: str, grayscale: bool = False) -> Tuple[str, str, Callable
         return "png", "png", parse_buffer_to_png, False
     if fmt in ("tif", "tiff"):
         return "tiff", "tif", None, True
+    if fmt == "ppm" and monochrome:
+        return "pbm", "pbm", parse_buffer_to_pbm, False
     if fmt == "ppm" and grayscale:
         return "pgm", "pgm", parse_buffer_to_pgm, False
     # Unable to parse the format so we'll use the default
@@ -496,15 +827,164 @@ def _get_command_path(command: str, poppler_path: str = None) -> str:
     return command
 
 
+class _PipedPDF:
+    """PDF bytes passed in place of a path, to be piped to poppler's stdin"""
+
+    def __init__(self, data: bytes):
+        self.data = data
+
+
+def _get_pdf_input(pdf_path: Union[str, _PipedPDF]) -> Tuple[str, bytes]:
+    """Return the path to give poppler, and the bytes to pipe to it if the PDF is piped"""
+    if isinstance(pdf_path, _PipedPDF):
+        # Poppler tools read the PDF from stdin when given "-" as the file name
+        return "-", pdf_path.data
+    return pdf_path, None
+
+
+def _feed_stdin(proc: Popen, data: bytes):
+    """Write the data to the process's stdin from a thread, so several processes can read at once"""
+    # The thread owns stdin from now on, so communicate() leaves it alone
+    stdin, proc.stdin = proc.stdin, None
+
+    def feed():
+        try:
+            stdin.write(data)
+        except OSError:
+            # Poppler stopped reading, e.g. after an error that it reports on stderr
+            pass
+        finally:
+            try:
+                stdin.close()
+            except OSError:
+                pass
+
+    threading.Thread(target=feed, daemon=True).start()
+
+
+class _PageScheduler:
+    """Hands out chunks of pages from a shared queue to a fixed set of poppler workers
+
+    Each worker takes the next chunk as soon as it has rendered its last one, so a stretch of
+    expensive pages is shared out instead of holding up a single worker. Chunks aim at
+    target_seconds of rendering, judged from the measured time per page, to amortise the start
+    of each poppler process, and never exceed a fair share of the remaining pages, so chunks
+    shrink towards single pages at the end and the workers finish together.
+    """
+
+    def __init__(self, pages: List[int], workers: int, target_seconds: float = 2.0):
+        self.pages = list(pages)
+        self.workers = max(1, workers)
+        self.target_seconds = target_seconds
+        self.next_index = 0
+        self.page_seconds = None
+        self.lock = threading.Lock()
+
+    def next_chunk(self) -> Tuple[int, List[int]]:
+        """Return the index of the next chunk in the page list and its pages, or None when done"""
+        with self.lock:
+            remaining = len(self.pages) - self.next_index
+            if remaining <= 0:
+                return None
+
+            if self.workers == 1:
+                size = remaining
+            else:
+                size = max(1, remaining // (2 * self.workers))
+                if self.page_seconds is None:
+                    # Start small so the time per page is known early
+                    size = 1
+                else:
+                    size = min(size, max(1, int(self.target_seconds / self.page_seconds)))
+
+            index = self.next_index
+            self.next_index += size
+            return index, self.pages[index : index + size]
+
+    def record(self, page_count: int, seconds: float):
+        """Update the estimated time per page with a finished chunk"""
+        with self.lock:
+            page_seconds = seconds / page_count
+            if self.page_seconds is None:
+                self.page_seconds = page_seconds
+            else:
+                self.page_seconds = 0.5 * (self.page_seconds + page_seconds)
+
+    def run(self, render_chunk: Callable) -> List:
+        """Render every page with render_chunk(pages) on the workers and return the results in page order"""
+        results = {}
+        errors = []
+
+        def work():
+            while True:
+                chunk = self.next_chunk()
+                if chunk is None:
+                    return
+                index, chunk_pages = chunk
+
+                start_time = time.perf_counter()
+                try:
+                    results[index] = render_chunk(chunk_pages)
+                except BaseException as e:
+                    with self.lock:
+                        errors.append(e)
+                        # No more chunks are handed out once a worker fails
+                        self.next_index = len(self.pages)
+                    return
+                self.record(len(chunk_pages), time.perf_counter() - start_time)
+
+        if self.workers == 1:
+            work()
+        else:
+            threads = [threading.Thread(target=work) for _ in range(self.workers)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        if errors:
+            raise errors[0]
+
+        return [item for index in sorted(results) for item in results[index]]
+
+
+def _select_pages(
+    page_count: int, first_page: int = None, last_page: int = None, pages: List[int] = None
+) -> List[int]:
+    """Return the sorted page numbers to render, within first_page and last_page"""
+    if first_page is None or first_page < 1:
+        first_page = 1
+
+    if last_page is None or last_page > page_count:
+        last_page = page_count
+
+    if pages is None:
+        return list(range(first_page, last_page + 1))
+    return sorted({page for page in pages if first_page <= page <= last_page})
+
+
+def _watch_process(args: List[str], proc: Popen) -> Callable:
+    """Report a started poppler process to process_hook, returning the function to call once it ends"""
+    if process_hook is None:
+        return lambda output_bytes: None
+    return process_hook(args, proc)
+
+
 def _get_poppler_version(
     command: str, poppler_path: str = None, timeout: int = None
 ) -> Tuple[int, int]:
     command = [_get_command_path(command, poppler_path), "-v"]
 
+    cache_key = _poppler_version_cache.key(shutil.which(command[0]) or command[0])
+    version = _poppler_version_cache.get(cache_key)
+    if version is not None:
+        return version
+
     env = os.environ.copy()
     if poppler_path is not None:
         env["LD_LIBRARY_PATH"] = poppler_path + ":" + env.get("LD_LIBRARY_PATH", "")
     proc = Popen(command, env=env, stdout=PIPE, stderr=PIPE)
+    process_done = _watch_process(command, proc)
 
     try:
         data, err = proc.communicate(timeout=timeout)
@@ -512,11 +992,14 @@ def _get_poppler_version(
         proc.kill()
         outs, errs = proc.communicate()
         raise PDFPopplerTimeoutError("Run poppler poppler timeout.")
+    process_done(len(data))
 
     try:
         # TODO: Make this more robust
         version = err.decode("utf8", "ignore").split("\n")[0].split(" ")[-1].split(".")
-        return int(version[0]), int(version[1])
+        version = int(version[0]), int(version[1])
+        _poppler_version_cache.put(cache_key, version)
+        return version
     except:
         # Lowest version that includes pdftocairo (2011)
         return 0, 17
@@ -556,6 +1039,18 @@ def pdfinfo_from_path(
     :return: Dictionary containing various information on the PDF
     :rtype: Dict
     """
+    pdf_path, pdf_data = _get_pdf_input(pdf_path)
+
+    # Piped PDFs have no file to key the cache on
+    cache_key = None
+    if pdf_data is None:
+        cache_key = _pdfinfo_cache.key(
+            pdf_path, userpw, ownerpw, poppler_path, rawdates, first_page, last_page
+        )
+    info = _pdfinfo_cache.get(cache_key)
+    if info is not None:
+        return dict(info)
+
     try:
         command = [_get_command_path("pdfinfo", poppler_path), pdf_path]
 
@@ -578,14 +1073,22 @@ def pdfinfo_from_path(
         env = os.environ.copy()
         if poppler_path is not None:
             env["LD_LIBRARY_PATH"] = poppler_path + ":" + env.get("LD_LIBRARY_PATH", "")
-        proc = Popen(command, env=env, stdout=PIPE, stderr=PIPE)
+        proc = Popen(
+            command,
+            env=env,
+            stdin=None if pdf_data is None else PIPE,
+            stdout=PIPE,
+            stderr=PIPE,
+        )
+        process_done = _watch_process(command, proc)
 
         try:
-            out, err = proc.communicate(timeout=timeout)
+            out, err = proc.communicate(pdf_data, timeout=timeout)
         except TimeoutExpired:
             proc.kill()
             outs, errs = proc.communicate()
             raise PDFPopplerTimeoutError("Run poppler poppler timeout.")
+        process_done(len(out))
 
         d = {}
         for field in out.decode("utf8", "ignore").split("\n"):
@@ -601,6 +1104,7 @@ def pdfinfo_from_path(
         if "Pages" not in d:
             raise ValueError
 
+        _pdfinfo_cache.put(cache_key, dict(d))
         return d
 
     except OSError:
@@ -622,6 +1126,7 @@ def pdfinfo_from_bytes(
     timeout: int = None,
     first_page: int = None,
     last_page: int = None,
+    use_stdin: bool = False,
 ) -> Dict:
     """Function wrapping poppler's pdfinfo utility and returns the result as a dictionary.
 
@@ -641,16 +1146,23 @@ def pdfinfo_from_bytes(
     :type first_page: int, optional
     :param last_page: Last page to process before stopping, defaults to None
     :type last_page: int, optional
+    :param use_stdin: Pipe the PDF to pdfinfo's stdin instead of writing it to a temporary file, defaults to False
+    :type use_stdin: bool, optional
     :return: Dictionary containing various information on the PDF
     :rtype: Dict
     """
-    fh, temp_filename = tempfile.mkstemp()
+    fh = None
+    if use_stdin:
+        pdf_path = _PipedPDF(pdf_bytes)
+    else:
+        fh, pdf_path = tempfile.mkstemp()
+
     try:
-        with open(temp_filename, "wb") as f:
-            f.write(pdf_bytes)
-            f.flush()
+        if fh is not None:
+            with open(pdf_path, "wb") as f:
+                f.write(pdf_bytes)
         return pdfinfo_from_path(
-            temp_filename,
+            pdf_path,
             userpw=userpw,
             ownerpw=ownerpw,
             poppler_path=poppler_path,
@@ -660,8 +1172,9 @@ def pdfinfo_from_bytes(
             last_page=last_page,
         )
     finally:
-        os.close(fh)
-        os.remove(temp_filename)
+        if fh is not None:
+            os.close(fh)
+            os.remove(pdf_path)
 
 
 def _load_from_output_folder(
@@ -670,14 +1183,56 @@ def _load_from_output_folder(
     ext: str,
     paths_only: bool,
     in_memory: bool = False,
+    file_names: List[str] = None,
 ) -> List[Image.Image]:
+    paths = None
+    if file_names is not None:
+        paths = [os.path.join(output_folder, f) for f in file_names]
+        if not all(os.path.isfile(path) for path in paths):
+            # Poppler named the files differently, so look for them in the folder instead
+            paths = None
+
+    if paths is None:
+        paths = [
+            os.path.join(output_folder, f)
+            for f in sorted(os.listdir(output_folder))
+            if f.startswith(output_file) and f.split(".")[-1] == ext
+        ]
+
     images = []
-    for f in sorted(os.listdir(output_folder)):
-        if f.startswith(output_file) and f.split(".")[-1] == ext:
-            if paths_only:
-                images.append(os.path.join(output_folder, f))
-            else:
-                images.append(Image.open(os.path.join(output_folder, f)))
-                if in_memory:
-                    images[-1].load()
+    for path in paths:
+        if paths_only:
+            images.append(path)
+        else:
+            images.append(Image.open(path))
+            if in_memory:
+                images[-1].load()
     return images
+
+
+def _get_output_file_names(
+    output_file: str, ext: str, pages: List[int], page_digits: int, single_file: bool
+) -> List[str]:
+    """Return the names of the files poppler writes for the pages, in page order
+
+    pdftoppm and pdftocairo name each page <output_file>-<page number>.<ext>, the page number
+    being zero-padded to the digits of the document's page count, or just <output_file>.<ext>
+    with -singlefile. Knowing the names saves listing the whole output folder for every process.
+
+    :param output_file: File name prefix given to poppler
+    :type output_file: str
+    :param ext: Extension of the output files
+    :type ext: str
+    :param pages: Page numbers rendered by the process
+    :type pages: List[int]
+    :param page_digits: Number of digits of the document's page count
+    :type page_digits: int
+    :param single_file: Whether poppler was run with -singlefile
+    :type single_file: bool
+    :return: File names of the rendered pages
+    :rtype: List[str]
+    """
+
+    if single_file:
+        return [f"{output_file}.{ext}"]
+    return [f"{output_file}-{page:0{page_digits}d}.{ext}" for page in pages]
@@ -0,0 +1,104 @@
+from PIL import Image #v10.4.0
+
+try:
+    import numpy #Optional, preprocessing is skipped without it
+    numpy_installed = True
+except ImportError:
+    numpy_installed = False
+
+def binarize(pixels, window=None, k=0.15):
+    '''Return the ink mask of a grayscale page array with an adaptive threshold.
+
+    A pixel is ink when it is more than k darker than the mean of the window x window square
+    around it, so shading, yellowed paper and uneven lighting do not turn into ink. The means
+    come from an integral image, so the cost does not depend on the window, which defaults to
+    a twentieth of the page width: wider than a letter, narrower than a shadow.
+    '''
+    height, width = pixels.shape
+    if window is None:
+        window = max(15, width // 20)
+    radius = window // 2
+
+    # Sums wrap around in uint32, but the window sums below are exact. Repeating the edges of the
+    # integral image clips the windows to the page, so the window sums are plain slices of it
+    integral = numpy.zeros((height + 2 * radius + 2, width + 2 * radius + 2), dtype=numpy.uint32)
+    integral[radius + 1:height + radius + 1, radius + 1:width + radius + 1] = pixels.cumsum(
+        axis=0, dtype=numpy.uint32).cumsum(axis=1, dtype=numpy.uint32)
+    integral[height + radius + 1:] = integral[height + radius]
+    integral[:, width + radius + 1:] = integral[:, width + radius, None]
+
+    end = 2 * radius + 1
+    sums = integral[end:end + height, end:end + width] - integral[:height, end:end + width]
+    sums -= integral[end:end + height, :width]
+    sums += integral[:height, :width]
+
+    # pixel < (1 - k) * mean, with the threshold in floats: sums times the window area would
+    # overflow uint32 on pages wider than about 8000 pixels
+    threshold = sums.astype(numpy.float32)
+    threshold *= (1 - k)
+    threshold /= _window_sizes(height, radius).astype(numpy.float32)[:, None]
+    threshold /= _window_sizes(width, radius).astype(numpy.float32)[None, :]
+    return pixels < threshold
+
+def _window_sizes(size, radius):
+    '''Return the length of the window around each position along a side of size pixels, clipped to the page.'''
+    positions = numpy.arange(size, dtype=numpy.uint32)
+    return numpy.minimum(positions + radius + 1, size) - numpy.maximum(positions, radius) + radius
+
+def despeckle(ink, min_neighbours=2):
+    '''Remove ink pixels with fewer than min_neighbours ink pixels among their eight neighbours.
+
+    Strokes of text are at least two pixels thick at the rendered resolutions, so every pixel
+    of a letter keeps its neighbours, while dust and scanner noise are dropped.
+    '''
+    padded = numpy.pad(ink, 1).astype(numpy.uint8)
+    height, width = ink.shape
+    neighbours = numpy.zeros(ink.shape, dtype=numpy.uint8)
+    for dy in (0, 1, 2):
+        for dx in (0, 1, 2):
+            if dy != 1 or dx != 1:
+                neighbours += padded[dy:dy + height, dx:dx + width]
+    return ink & (neighbours >= min_neighbours)
+
+def estimate_skew(ink, max_angle=5.0, step=0.1, sample=4):
+    '''Return the angle in degrees that the page has to be turned counter-clockwise to level its lines.
+
+    The ink pixels of every sample-th row and column are projected onto rows at a range of
+    candidate angles at once. The angle whose projection is the most uneven, every line of text
+    falling into a few rows with white space between them, is the skew. Angles up to max_angle are
+    tried half a degree apart, then refined to step around the best of them.
+    '''
+    rows, columns = numpy.nonzero(ink[::sample, ::sample])
+    if rows.size == 0:
+        return 0.0
+
+    coarse = _best_angle(rows, columns, numpy.arange(-max_angle, max_angle + 0.25, 0.5))
+    return _best_angle(rows, columns, numpy.arange(coarse - 0.5, coarse + 0.5 + step / 2, step))
+
+def _best_angle(rows, columns, degrees):
+    '''Return the angle, out of the given degrees, at which the projection of the ink is the most uneven.'''
+    angles = numpy.radians(degrees)
+    projected = numpy.rint(rows[None, :] - columns[None, :] * numpy.tan(angles)[:, None]).astype(numpy.int64)
+    projected -= projected.min()
+    row_count = int(projected.max()) + 1
+
+    # One histogram per angle, counted in a single pass by offsetting each angle's rows
+    projected += numpy.arange(len(angles))[:, None] * row_count
+    profiles = numpy.bincount(projected.ravel(), minlength=len(angles) * row_count).reshape(len(angles), row_count)
+    scores = (profiles.astype(numpy.float64) ** 2).sum(axis=1)
+    return float(degrees[numpy.argmax(scores)])
+
+def clean_page(image, max_angle=5.0):
+    '''Return a clean 1-bit copy of a page image for OCR: binarized, despeckled and deskewed.
+
+    The result is black text on white, which Tesseract does not need to threshold again, and is
+    only turned when the skew is at least a tenth of a degree.
+    '''
+    pixels = numpy.asarray(image.convert('L'), dtype=numpy.uint8)
+    ink = despeckle(binarize(pixels))
+    angle = estimate_skew(ink, max_angle)
+
+    cleaned = Image.fromarray(~ink)
+    if abs(angle) >= 0.1:
+        cleaned = cleaned.rotate(angle, resample=Image.NEAREST, fillcolor=255)
+    return cleaned
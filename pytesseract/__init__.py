@@ -8,9 +8,11 @@ from .pytesseract import image_to_data
 from .pytesseract import image_to_osd
 from .pytesseract import image_to_pdf_or_hocr
 from .pytesseract import image_to_string
+from .pytesseract import images_to_strings
 from .pytesseract import Output
 from .pytesseract import run_and_get_multiple_output
 from .pytesseract import run_and_get_output
+from .pytesseract import run_and_get_piped_output
 from .pytesseract import TesseractError
 from .pytesseract import TesseractNotFoundError
 from .pytesseract import TSVNotSupported
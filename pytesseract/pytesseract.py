@@ -6,6 +6,7 @@ import string
 import subprocess
 import sys
 from contextlib import contextmanager
+from contextlib import ExitStack
 from csv import QUOTE_NONE
 from errno import ENOENT
 from functools import wraps
@@ -22,6 +23,7 @@ from tempfile import NamedTemporaryFile
 from time import sleep
 from typing import List
 from typing import Optional
+from uuid import uuid4
 
 from packaging.version import InvalidVersion
 from packaging.version import parse
@@ -31,6 +33,15 @@ from PIL import Image
 
 tesseract_cmd = 'tesseract'
 
+# Optional callable, called as process_hook(args, process) whenever a tesseract
+# process is started; the function it returns is called with the size of the
+# process output once the process has ended.
+process_hook = None
+
+# Optional dict of environment variables set for tesseract processes only, on
+# top of the environment of this process, which is left unchanged.
+tesseract_env = None
+
 try:
     from numpy import ndarray
 
@@ -138,15 +149,14 @@ def kill(process, code):
 
 
 @contextmanager
-def timeout_manager(proc, seconds=None):
+def timeout_manager(proc, seconds=None, input_data=None):
     try:
         if not seconds:
-            yield proc.communicate()[1]
+            yield proc.communicate(input_data)
             return
 
         try:
-            _, error_string = proc.communicate(timeout=seconds)
-            yield error_string
+            yield proc.communicate(input_data, timeout=seconds)
         except subprocess.TimeoutExpired:
             kill(proc, -1)
             raise RuntimeError('Tesseract process timeout')
@@ -204,6 +214,17 @@ def prepare(image):
     return image, extension
 
 
+def to_pnm(image):
+    """Encodes the image as uncompressed PBM/PGM/PPM bytes for tesseract's stdin."""
+    image, _ = prepare(image)
+    if image.mode not in {'1', 'L', RGB_MODE}:
+        image = image.convert(RGB_MODE)
+
+    buffer = BytesIO()
+    image.save(buffer, format='PPM')
+    return buffer.getvalue()
+
+
 @contextmanager
 def save(image):
     try:
@@ -227,7 +248,7 @@ def subprocess_args(include_stdout=True):
         'stdin': subprocess.PIPE,
         'stderr': subprocess.PIPE,
         'startupinfo': None,
-        'env': environ,
+        'env': environ if not tesseract_env else {**environ, **tesseract_env},
     }
 
     if hasattr(subprocess, 'STARTUPINFO'):
@@ -251,6 +272,7 @@ def run_tesseract(
     config='',
     nice=0,
     timeout=0,
+    input_data=None,
 ):
     cmd_args = []
     not_windows = not (sys.platform == 'win32')
@@ -279,10 +301,15 @@ def run_tesseract(
         else:
             raise TesseractNotFoundError()
 
-    with timeout_manager(proc, timeout) as error_string:
+    process_done = process_hook(cmd_args, proc) if process_hook else None
+    with timeout_manager(proc, timeout, input_data) as (output, error_string):
+        if process_done is not None:
+            process_done(len(output))
         if proc.returncode:
             raise TesseractError(proc.returncode, get_errors(error_string))
 
+    return output
+
 
 def _read_output(filename: str, return_bytes: bool = False):
     with open(filename, 'rb') as output_file:
@@ -337,7 +364,19 @@ def run_and_get_output(
     nice=0,
     timeout=0,
     return_bytes=False,
+    use_stdin=False,
 ):
+    if use_stdin:
+        return run_and_get_piped_output(
+            image,
+            extension,
+            lang,
+            config,
+            nice,
+            timeout,
+            return_bytes,
+        )
+
     with save(image) as (temp_name, input_filename):
         kwargs = {
             'input_filename': input_filename,
@@ -356,6 +395,103 @@ def run_and_get_output(
         )
 
 
+def run_and_get_piped_output(
+    image,
+    extension='',
+    lang=None,
+    config='',
+    nice=0,
+    timeout=0,
+    return_bytes=False,
+):
+    """
+    Runs tesseract without temp files: images are streamed to stdin as
+    uncompressed PNM and the result is read back from stdout
+    """
+    if isinstance(image, str):
+        input_filename, input_data = realpath(normpath(normcase(image))), None
+    else:
+        input_filename, input_data = '-', to_pnm(image)
+
+    output = run_tesseract(
+        input_filename,
+        'stdout',
+        extension,
+        lang,
+        config,
+        nice,
+        timeout,
+        input_data,
+    )
+    return output if return_bytes else output.decode(DEFAULT_ENCODING)
+
+
+def split_batch_output(output, separator, count):
+    """
+    Splits the text of a multi-page run back into one string per page.
+    Depending on its version, tesseract writes the page separator between
+    pages or after every page. Returns None if the output does not match
+    the number of pages.
+    """
+    pages = output.split(separator)
+    if len(pages) == count + 1 and not pages[-1].strip():
+        pages = pages[:-1]
+    elif len(pages) == count + 1 and not pages[0].strip():
+        pages = pages[1:]
+    return pages if len(pages) == count else None
+
+
+def images_to_strings(
+    images,
+    lang=None,
+    config='',
+    nice=0,
+    timeout=0,
+):
+    """
+    Returns the results of a single Tesseract OCR run over all the provided
+    images, one string per image. Tesseract loads its models once for the
+    whole list, and the timeout applies to the whole run. Falls back to one
+    run per image if the combined output cannot be split reliably. Split
+    pages come without the form feed that image_to_string leaves at the end
+    of the text, but the per-image fallback keeps it.
+    """
+    images = list(images)
+    if len(images) < 2:
+        return [image_to_string(image, lang, config, nice, timeout=timeout) for image in images]
+
+    # A unique separator cannot be confused with recognised text
+    separator = f'[[pytesseract-page-{uuid4().hex}]]'
+    batch_config = f'-c page_separator={separator} {config.strip()}'
+
+    with ExitStack() as stack:
+        input_filenames = [
+            stack.enter_context(save(image))[1] for image in images
+        ]
+        with NamedTemporaryFile(
+            'w', prefix='tess_', suffix='.txt', delete=False, encoding=DEFAULT_ENCODING,
+        ) as list_file:
+            list_file.write('\n'.join(input_filenames) + '\n')
+        stack.callback(cleanup, list_file.name)
+
+        output = run_tesseract(
+            list_file.name,
+            'stdout',
+            'txt',
+            lang,
+            batch_config,
+            nice,
+            timeout,
+        ).decode(DEFAULT_ENCODING)
+
+    pages = split_batch_output(output, separator, len(images))
+    if pages is not None:
+        return pages
+
+    LOGGER.warning('Unable to split batch output, running tesseract per image')
+    return [image_to_string(image, lang, config, nice, timeout=timeout) for image in images]
+
+
 def file_to_dict(tsv, cell_delimiter, str_col_idx):
     result = {}
     rows = [row.split(cell_delimiter) for row in tsv.strip().split('\n')]
@@ -477,6 +613,7 @@ def image_to_string(
     nice=0,
     output_type=Output.STRING,
     timeout=0,
+    use_stdin=False,
 ):
     """
     Returns the result of a Tesseract OCR run on the provided image to string
@@ -484,9 +621,14 @@ def image_to_string(
     args = [image, 'txt', lang, config, nice, timeout]
 
     return {
-        Output.BYTES: lambda: run_and_get_output(*(args + [True])),
-        Output.DICT: lambda: {'text': run_and_get_output(*args)},
-        Output.STRING: lambda: run_and_get_output(*args),
+        Output.BYTES: lambda: run_and_get_output(
+            *(args + [True]),
+            use_stdin=use_stdin,
+        ),
+        Output.DICT: lambda: {
+            'text': run_and_get_output(*args, use_stdin=use_stdin),
+        },
+        Output.STRING: lambda: run_and_get_output(*args, use_stdin=use_stdin),
     }[output_type]()
 
 
@@ -0,0 +1,5 @@
+import os #Built-in for Python 3.12.6
+import sys #Built-in for Python 3.12.6
+
+# The plugin modules sit at the root of the plugin folder, outside of any package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
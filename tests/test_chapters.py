@@ -0,0 +1,91 @@
+import importlib #Built-in for Python 3.12.6
+import os #Built-in for Python 3.12.6
+import sys #Built-in for Python 3.12.6
+import types #Built-in for Python 3.12.6
+
+import pytest
+
+# main.py only needs Calibre for the base class of the plugin, which the chapter division does not use,
+# so outside of calibre-debug an empty base class takes its place
+try:
+    importlib.import_module('calibre.gui2.actions')
+except ImportError:
+    actions = types.ModuleType('calibre.gui2.actions')
+    actions.InterfaceAction = type('InterfaceAction', (), {})
+    for name in ('calibre', 'calibre.gui2'):
+        sys.modules.setdefault(name, types.ModuleType(name))
+    sys.modules['calibre.gui2.actions'] = actions
+
+from main import InterfacePlugin
+
+@pytest.fixture
+def plugin():
+    # Calibre's InterfaceAction wants the main window when created, so the plugin is left uninitialised
+    return InterfacePlugin.__new__(InterfacePlugin)
+
+@pytest.fixture
+def ocr_output_folder(tmp_path):
+    folder = tmp_path / 'ocr_output'
+    folder.mkdir()
+    return folder
+
+def write_pages(folder, pages):
+    for name, text in pages.items():
+        (folder / name).write_text(text, encoding='utf-8')
+
+def read_chapters(ocr_output_folder):
+    chapters_folder = ocr_output_folder.parent / 'chapters'
+    return {path.name: path.read_text(encoding='utf-8') for path in sorted(chapters_folder.iterdir())}
+
+def test_page_index_is_in_natural_order(plugin, ocr_output_folder):
+    write_pages(ocr_output_folder, {f'page_{number}.txt': '' for number in (10, 2, 1, 11, 3)})
+    (ocr_output_folder / 'page_4.png').write_bytes(b'')
+    names = [os.path.basename(path) for path in plugin.build_page_index(str(ocr_output_folder))]
+    assert names == ['page_1.txt', 'page_2.txt', 'page_3.txt', 'page_10.txt', 'page_11.txt']
+
+def test_chapters_follow_page_order(plugin, ocr_output_folder):
+    # page_10 sorts before page_2 as a string, which would put the start of chapter 2 into chapter 1
+    write_pages(ocr_output_folder, {
+        'page_1.txt': 'Chapter 1\nThe beginning.\n',
+        'page_2.txt': 'Still the first chapter.\n',
+        'page_10.txt': 'Chapter 2\nThe end.\n',
+    })
+    result = plugin.divide_text_into_chapters(str(ocr_output_folder))
+    assert result.startswith('Chapters divided and saved in:')
+    assert read_chapters(ocr_output_folder) == {
+        'Chapter_1.txt': 'Chapter 1\nThe beginning.\nStill the first chapter.\n',
+        'Chapter_2.txt': 'Chapter 2\nThe end.\n',
+    }
+
+def test_chapter_starts_in_the_middle_of_a_page(plugin, ocr_output_folder):
+    write_pages(ocr_output_folder, {
+        'page_1.txt': 'Chapter 1\nShort chapter.\n\nCHAPTER 2\nNext chapter.\n',
+    })
+    plugin.divide_text_into_chapters(str(ocr_output_folder))
+    assert read_chapters(ocr_output_folder) == {
+        'Chapter_1.txt': 'Chapter 1\nShort chapter.\n\n',
+        'Chapter_2.txt': 'CHAPTER 2\nNext chapter.\n',
+    }
+
+def test_text_before_the_first_chapter_is_left_out(plugin, ocr_output_folder):
+    write_pages(ocr_output_folder, {
+        'page_1.txt': 'Title page\n',
+        'page_2.txt': 'Chapter 1\nText.\n',
+    })
+    plugin.divide_text_into_chapters(str(ocr_output_folder))
+    assert read_chapters(ocr_output_folder) == {'Chapter_1.txt': 'Chapter 1\nText.\n'}
+
+def test_headings_are_only_looked_for_at_the_top_of_a_page(plugin, ocr_output_folder):
+    # A reference to a chapter further down the page is body text, not a heading
+    write_pages(ocr_output_folder, {
+        'page_1.txt': 'Chapter 1\n' + 'Line.\n' * 5 + 'Chapter 2 explains the rest.\n',
+    })
+    plugin.divide_text_into_chapters(str(ocr_output_folder))
+    assert read_chapters(ocr_output_folder) == {
+        'Chapter_1.txt': 'Chapter 1\n' + 'Line.\n' * 5 + 'Chapter 2 explains the rest.\n',
+    }
+
+def test_no_chapter_headings(plugin, ocr_output_folder):
+    write_pages(ocr_output_folder, {'page_1.txt': 'Just text.\n'})
+    assert plugin.divide_text_into_chapters(str(ocr_output_folder)) == 'No chapter headings found in the OCR text files.'
+    assert not (ocr_output_folder.parent / 'chapters').exists()
@@ -0,0 +1,46 @@
+import random #Built-in for Python 3.12.6
+
+import pytest
+from PIL import Image, ImageChops, ImageDraw, ImageFont #v10.4.0
+
+from layout import make_thumbnail, is_blank
+
+# A half page of a spread rendered at the default 200 DPI
+PAGE_SIZE = (1700, 2200)
+
+def make_page(paper='white', specks=0, seed=0):
+    '''Return an empty page of white or shaded paper with a number of small specks of dust.'''
+    rng = random.Random(seed)
+    page = Image.new('L', PAGE_SIZE, 255)
+    if paper == 'shaded':
+        shading = Image.linear_gradient('L').rotate(90).resize(PAGE_SIZE).point(lambda level: 170 + level // 5)
+        page = ImageChops.darker(page, shading)
+    draw = ImageDraw.Draw(page)
+    for _ in range(specks):
+        x, y = rng.randrange(PAGE_SIZE[0]), rng.randrange(PAGE_SIZE[1])
+        draw.ellipse((x - 1, y - 1, x + 1, y + 1), fill=rng.randrange(100))
+    return page
+
+@pytest.mark.parametrize('paper', ['white', 'shaded'])
+@pytest.mark.parametrize('specks', [0, 20])
+def test_empty_page_is_blank(paper, specks):
+    assert is_blank(make_thumbnail(make_page(paper, specks)))
+
+# 24 to 36 pixels is body text at 200 DPI, about 9 to 13 pt
+@pytest.mark.parametrize('size', [24, 30, 36])
+@pytest.mark.parametrize('text', ['Chapter 12', 'Contents', 'Part Two', 'THE END', 'Index', '42', '7', 'iv'])
+@pytest.mark.parametrize('paper', ['white', 'shaded'])
+def test_single_word_is_not_blank(paper, text, size):
+    page = make_page(paper, specks=20, seed=size)
+    ImageDraw.Draw(page).text((600, 1500), text, font=ImageFont.load_default(size), fill=0)
+    assert not is_blank(make_thumbnail(page))
+
+def test_grey_page_number_is_not_blank():
+    page = make_page()
+    ImageDraw.Draw(page).text((820, 2100), '7', font=ImageFont.load_default(24), fill=90)
+    assert not is_blank(make_thumbnail(page))
+
+def test_bilevel_page_is_not_blank():
+    page = make_page()
+    ImageDraw.Draw(page).text((600, 400), 'Index', font=ImageFont.load_default(24), fill=0)
+    assert not is_blank(make_thumbnail(page.convert('1')))
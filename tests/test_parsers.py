@@ -0,0 +1,77 @@
+from io import BytesIO #Built-in for Python 3.12.6
+
+import pytest
+from PIL import Image #v10.4.0
+
+from pdf2image.parsers import parse_buffer_to_pbm, parse_buffer_to_pgm, parse_buffer_to_png, parse_buffer_to_ppm, parse_stream_to_pnm
+
+# Pillow saves mode '1' as P4, 'L' as P5 and 'RGB' as P6, the formats written by pdftoppm -mono, -gray and plain
+PNM_MODES = {'P4': '1', 'P5': 'L', 'P6': 'RGB'}
+
+# Widths that are and are not a multiple of 8, since P4 pads every row to a whole byte
+SIZES = [(16, 10), (13, 7), (1, 1), (40, 3)]
+
+def make_images(mode, sizes=SIZES):
+    '''Return one image per size, with different pixels on every row so that a misaligned row shows.'''
+    images = []
+    for index, (width, height) in enumerate(sizes):
+        image = Image.effect_noise((width, height), 64 + index).convert(mode)
+        images.append(image)
+    return images
+
+def save_images(images, format_name):
+    '''Concatenate the images the way poppler writes several pages to stdout.'''
+    buffer = BytesIO()
+    for image in images:
+        image.save(buffer, format_name)
+    return buffer.getvalue()
+
+def assert_same_images(parsed, images):
+    assert len(parsed) == len(images)
+    for parsed_image, image in zip(parsed, images):
+        assert parsed_image.mode == image.mode
+        assert parsed_image.size == image.size
+        assert parsed_image.tobytes() == image.tobytes()
+
+@pytest.mark.parametrize('magic, parse', [('P4', parse_buffer_to_pbm), ('P5', parse_buffer_to_pgm), ('P6', parse_buffer_to_ppm)])
+def test_parse_buffer_to_pnm(magic, parse):
+    images = make_images(PNM_MODES[magic])
+    data = save_images(images, 'PPM')
+    assert data.startswith(magic.encode())
+    assert_same_images(parse(data), images)
+
+def test_parse_buffer_to_pnm_empty():
+    assert parse_buffer_to_ppm(b'') == []
+
+def test_parse_buffer_to_pnm_truncated():
+    # Unlike the stream, a buffer is only parsed once poppler has exited, so a short page is an error
+    data = save_images(make_images('RGB'), 'PPM')
+    with pytest.raises(ValueError):
+        parse_buffer_to_ppm(data[:-5])
+
+@pytest.mark.parametrize('magic', ['P4', 'P5', 'P6'])
+def test_parse_stream_to_pnm(magic):
+    images = make_images(PNM_MODES[magic])
+    parsed = list(parse_stream_to_pnm(BytesIO(save_images(images, 'PPM'))))
+    assert_same_images(parsed, images)
+
+@pytest.mark.parametrize('cut', [1, 5, 40])
+def test_parse_stream_to_pnm_truncated(cut):
+    # A poppler process that stopped half way through a page yields only the pages it wrote whole
+    images = make_images('RGB')
+    data = save_images(images, 'PPM')
+    parsed = list(parse_stream_to_pnm(BytesIO(data[:-cut])))
+    assert_same_images(parsed, images[:-1])
+
+def test_parse_stream_to_pnm_reads_lazily():
+    images = make_images('L')
+    pages = parse_stream_to_pnm(BytesIO(save_images(images, 'PPM')))
+    assert_same_images([next(pages)], images[:1])
+
+def test_parse_buffer_to_png():
+    images = make_images('RGB')
+    assert_same_images(parse_buffer_to_png(save_images(images, 'PNG')), images)
+
+def test_parse_buffer_to_png_mixed_modes():
+    images = make_images('L', SIZES[:2]) + make_images('RGB', SIZES[2:])
+    assert_same_images(parse_buffer_to_png(save_images(images, 'PNG')), images)
@@ -0,0 +1,38 @@
+import pytest
+
+from pdf2image.pdf2image import _get_page_runs, _select_pages
+
+@pytest.mark.parametrize('pages, runs', [
+    ([], []),
+    ([5], [(5, 5, None)]),
+    ([1, 2, 3, 4], [(1, 4, None)]),
+    # Every other page is rendered with -o or -e, by the parity of the first page of the run
+    ([1, 3, 5, 7], [(1, 7, 'odd')]),
+    ([2, 4, 6], [(2, 6, 'even')]),
+    # Two pages with one page between them already make a parity run
+    ([1, 3], [(1, 3, 'odd')]),
+    ([1, 3, 4], [(1, 3, 'odd'), (4, 4, None)]),
+    ([1, 2, 4, 6], [(1, 2, None), (4, 6, 'even')]),
+    ([1, 2, 3, 10, 12, 20], [(1, 3, None), (10, 12, 'even'), (20, 20, None)]),
+    ([3, 7, 11], [(3, 3, None), (7, 7, None), (11, 11, None)]),
+])
+def test_get_page_runs(pages, runs):
+    assert _get_page_runs(pages) == runs
+
+@pytest.mark.parametrize('pages', [[1, 3, 4, 9, 10, 12], list(range(2, 40, 2)), [1, 2, 5, 7, 9, 10]])
+def test_get_page_runs_covers_pages(pages):
+    # The runs must render exactly the requested pages, nothing in between
+    rendered = []
+    for first, last, parity in _get_page_runs(pages):
+        rendered.extend(range(first, last + 1, 1 if parity is None else 2))
+    assert rendered == pages
+
+@pytest.mark.parametrize('first_page, last_page, pages, selected', [
+    (None, None, None, [1, 2, 3, 4, 5]),
+    (2, 4, None, [2, 3, 4]),
+    (0, 10, None, [1, 2, 3, 4, 5]),
+    (None, None, [4, 2, 2, 9, 1], [1, 2, 4]),
+    (2, 4, [1, 2, 3, 5], [2, 3]),
+])
+def test_select_pages(first_page, last_page, pages, selected):
+    assert _select_pages(5, first_page, last_page, pages) == selected
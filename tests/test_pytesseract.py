@@ -0,0 +1,39 @@
+import pytest
+
+from pytesseract.pytesseract import split_batch_output
+
+SEPARATOR = '[[pytesseract-page-0123456789abcdef]]'
+PAGES = ['First page\n', 'Second page\n\nwith two paragraphs\n', 'Third page\n']
+
+def test_separator_between_pages():
+    output = SEPARATOR.join(PAGES)
+    assert split_batch_output(output, SEPARATOR, 3) == PAGES
+
+def test_separator_after_every_page():
+    output = ''.join(page + SEPARATOR for page in PAGES)
+    assert split_batch_output(output, SEPARATOR, 3) == PAGES
+
+def test_separator_after_every_page_with_trailing_newline():
+    output = ''.join(page + SEPARATOR for page in PAGES) + '\n'
+    assert split_batch_output(output, SEPARATOR, 3) == PAGES
+
+def test_separator_before_every_page():
+    output = ''.join(SEPARATOR + page for page in PAGES)
+    assert split_batch_output(output, SEPARATOR, 3) == PAGES
+
+def test_empty_pages_are_kept():
+    # A blank page still takes its place, so the text of the next pages is not shifted
+    pages = ['First page\n', '', 'Third page\n']
+    assert split_batch_output(SEPARATOR.join(pages), SEPARATOR, 3) == pages
+
+def test_single_page():
+    assert split_batch_output('Only page\n', SEPARATOR, 1) == ['Only page\n']
+
+@pytest.mark.parametrize('output, count', [
+    # Tesseract failed on a page, or the separator option was ignored
+    (SEPARATOR.join(PAGES[:2]), 3),
+    (''.join(PAGES), 3),
+    (SEPARATOR.join(PAGES + ['Extra page\n', 'Another page\n']), 3),
+])
+def test_mismatch_returns_none(output, count):
+    assert split_batch_output(output, SEPARATOR, count) is None
@@ -1,4 +1,133 @@
-from qt.core import QDialog, QLabel, QPushButton, QVBoxLayout, QFileDialog, QLineEdit #Built-in for Calibre 7.17
+from qt.core import QDialog, QLabel, QPushButton, QVBoxLayout, QFileDialog, QLineEdit, QWidget, QFormLayout, QSpinBox, QComboBox, QCheckBox, QProgressBar, QThread, pyqtSignal #Built-in for Calibre 7.17
+from calibre.utils.config import JSONConfig #Built-in for Calibre 7.17
+import os #Built-in for Python 3.12.6
+import threading #Built-in for Python 3.12.6
+from functools import partial #Built-in for Python 3.12.6
+
+# Plugin settings, stored as plugins/image_based_pdf_processor.json in the Calibre config folder
+prefs = JSONConfig('plugins/image_based_pdf_processor')
+prefs.defaults['ocr_workers'] = os.cpu_count() or 1
+prefs.defaults['ocr_batch_size'] = 4
+prefs.defaults['ocr_cache_size_mb'] = 512
+prefs.defaults['concurrent_books'] = 2
+prefs.defaults['render_profile'] = 'color'
+prefs.defaults['split_mode'] = 'image'
+prefs.defaults['detect_gutters'] = True
+prefs.defaults['skip_blank_pages'] = False
+prefs.defaults['preprocess_pages'] = False
+
+# Rendering profiles offered in the settings, as (setting value, label)
+RENDER_PROFILES = [
+    ('color', 'Color'),
+    ('grayscale', 'Grayscale (faster OCR, smaller images)'),
+    ('bilevel', 'Black and white (fastest, text only)'),
+]
+
+# Ways of splitting spreads offered in the settings, as (setting value, label)
+SPLIT_MODES = [
+    ('image', 'Render the spread, then crop it'),
+    ('poppler', 'Render each half directly (less memory)'),
+]
+
+
+class ConfigWidget(QWidget):
+    '''Settings shown under Preferences -> Plugins.'''
+
+    def __init__(self):
+        QWidget.__init__(self)
+        self.layout = QFormLayout(self)
+
+        # Number of pages OCR'd at the same time
+        self.ocrWorkersSpin = QSpinBox(self)
+        self.ocrWorkersSpin.setRange(1, 256)
+        self.ocrWorkersSpin.setValue(prefs['ocr_workers'])
+        self.layout.addRow('Parallel OCR workers:', self.ocrWorkersSpin)
+
+        # Pages recognised by each tesseract process, so models are loaded once per batch
+        self.ocrBatchSizeSpin = QSpinBox(self)
+        self.ocrBatchSizeSpin.setRange(1, 256)
+        self.ocrBatchSizeSpin.setValue(prefs['ocr_batch_size'])
+        self.layout.addRow('Pages per Tesseract run:', self.ocrBatchSizeSpin)
+
+        # Size limit of the cache of OCR results, 0 turns the cache off
+        self.ocrCacheSizeSpin = QSpinBox(self)
+        self.ocrCacheSizeSpin.setRange(0, 1024 * 1024)
+        self.ocrCacheSizeSpin.setSuffix(' MB')
+        self.ocrCacheSizeSpin.setValue(prefs['ocr_cache_size_mb'])
+        self.layout.addRow('OCR cache size:', self.ocrCacheSizeSpin)
+
+        # Books processed at the same time by Process Selected Books
+        self.concurrentBooksSpin = QSpinBox(self)
+        self.concurrentBooksSpin.setRange(1, 64)
+        self.concurrentBooksSpin.setValue(prefs['concurrent_books'])
+        self.layout.addRow('Books processed at once:', self.concurrentBooksSpin)
+
+        # Colours the pages are rendered in before they are split and OCR'd
+        self.renderProfileCombo = QComboBox(self)
+        for value, label in RENDER_PROFILES:
+            self.renderProfileCombo.addItem(label, value)
+        self.renderProfileCombo.setCurrentIndex(max(0, self.renderProfileCombo.findData(prefs['render_profile'])))
+        self.layout.addRow('Page rendering:', self.renderProfileCombo)
+
+        # Whether poppler renders the halves of each spread or the spread is cropped after rendering
+        self.splitModeCombo = QComboBox(self)
+        for value, label in SPLIT_MODES:
+            self.splitModeCombo.addItem(label, value)
+        self.splitModeCombo.setCurrentIndex(max(0, self.splitModeCombo.findData(prefs['split_mode'])))
+        self.layout.addRow('Page splitting:', self.splitModeCombo)
+
+        # Whether spreads are cut at their detected spine and single pages kept whole
+        self.detectGuttersCheck = QCheckBox('Find the spine of each spread (needs NumPy)', self)
+        self.detectGuttersCheck.setChecked(prefs['detect_gutters'])
+        self.layout.addRow('', self.detectGuttersCheck)
+
+        # Whether blank pages get empty text without running Tesseract
+        self.skipBlankCheck = QCheckBox('Skip OCR of blank pages', self)
+        self.skipBlankCheck.setChecked(prefs['skip_blank_pages'])
+        self.layout.addRow('', self.skipBlankCheck)
+
+        # Default for the dialog's choice of cleaning pages up before OCR
+        self.preprocessCheck = QCheckBox('Clean up pages before OCR by default (needs NumPy)', self)
+        self.preprocessCheck.setChecked(prefs['preprocess_pages'])
+        self.layout.addRow('', self.preprocessCheck)
+
+    def save_settings(self):
+        prefs['ocr_workers'] = self.ocrWorkersSpin.value()
+        prefs['ocr_batch_size'] = self.ocrBatchSizeSpin.value()
+        prefs['ocr_cache_size_mb'] = self.ocrCacheSizeSpin.value()
+        prefs['concurrent_books'] = self.concurrentBooksSpin.value()
+        prefs['render_profile'] = self.renderProfileCombo.currentData()
+        prefs['split_mode'] = self.splitModeCombo.currentData()
+        prefs['detect_gutters'] = self.detectGuttersCheck.isChecked()
+        prefs['skip_blank_pages'] = self.skipBlankCheck.isChecked()
+        prefs['preprocess_pages'] = self.preprocessCheck.isChecked()
+
+
+class ConversionWorker(QThread):
+    '''Runs a conversion off the GUI thread so Calibre stays responsive.
+
+    job is a plugin method with its paths already bound, such as a partial of
+    convert_pdf_to_images or process_books, and is called with progress and cancel_event.
+    '''
+
+    # Emitted as (stage, done, total) while the conversion runs
+    progress = pyqtSignal(str, int, int)
+    # Emitted with the status message once the conversion has finished or been cancelled
+    result_ready = pyqtSignal(str)
+
+    def __init__(self, job, parent=None):
+        QThread.__init__(self, parent)
+        self.job = job
+        self.cancel_event = threading.Event()
+
+    def run(self):
+        result_message = self.job(progress=self.progress.emit, cancel_event=self.cancel_event)
+        self.result_ready.emit(result_message)
+
+    def cancel(self):
+        '''Ask the conversion to stop at the next page.'''
+        self.cancel_event.set()
+
 
 class PDFConverterDialog(QDialog):
     '''Main dialog for the Image-based PDF Processor plugin.'''
@@ -7,6 +136,8 @@ class PDFConverterDialog(QDialog):
         QDialog.__init__(self, gui)
         self.gui = gui
         self.plugin = plugin  # Store the plugin instance
+        self.worker = None
+        self.stage_progress = {}
         self.setWindowIcon(icon)
         self.setWindowTitle('Image-based PDF Processor')
 
@@ -31,13 +162,35 @@ class PDFConverterDialog(QDialog):
         self.selectOutputButton.clicked.connect(self.select_output_folder)
         self.layout.addWidget(self.selectOutputButton)
 
+        # Whether the books converted next are binarized, despeckled and deskewed before OCR
+        self.preprocessCheck = QCheckBox('Clean up pages before OCR (threshold, despeckle, deskew)', self)
+        self.preprocessCheck.setChecked(plugin.preprocess_pages)
+        self.layout.addWidget(self.preprocessCheck)
+
         # Convert button
         self.convertButton = QPushButton('Start Processing', self)
         self.convertButton.clicked.connect(self.convert_pdf_to_images)
         self.layout.addWidget(self.convertButton)
 
+        # Batch conversion of the books selected in the Calibre library
+        self.convertSelectedButton = QPushButton('Process Selected Books', self)
+        self.convertSelectedButton.clicked.connect(self.convert_selected_books)
+        self.layout.addWidget(self.convertSelectedButton)
+
+        # Cancel button, only enabled while a conversion is running
+        self.cancelButton = QPushButton('Cancel', self)
+        self.cancelButton.clicked.connect(self.cancel_conversion)
+        self.cancelButton.setEnabled(False)
+        self.layout.addWidget(self.cancelButton)
+
+        # Progress of the OCR stage, which dominates the running time
+        self.progressBar = QProgressBar(self)
+        self.progressBar.setVisible(False)
+        self.layout.addWidget(self.progressBar)
+
         # Status label
         self.statusLabel = QLabel('', self)
+        self.statusLabel.setWordWrap(True)
         self.layout.addWidget(self.statusLabel)
 
     def select_pdf_file(self):
@@ -58,6 +211,71 @@ class PDFConverterDialog(QDialog):
             self.statusLabel.setText('Please select both input and output paths.')
             return
 
-        # Use the existing plugin instance to call the conversion method
-        result_message = self.plugin.convert_pdf_to_images(pdf_path, output_folder)
+        self.start_worker(partial(self.plugin.convert_pdf_to_images, pdf_path, output_folder,
+                                  preprocess=self.preprocessCheck.isChecked()))
+
+    def convert_selected_books(self):
+        output_folder = self.outputPathEdit.text()
+
+        if not output_folder:
+            self.statusLabel.setText('Please select an output folder.')
+            return
+
+        book_names = self.plugin.get_selected_pdf_paths()
+        if not book_names:
+            self.statusLabel.setText('None of the selected books has a PDF format.')
+            return
+
+        self.start_worker(partial(self.plugin.process_books, list(book_names), output_folder,
+                                  preprocess=self.preprocessCheck.isChecked(), book_names=book_names))
+
+    def start_worker(self, job):
+        # Run the conversion on a background thread, the plugin reports back through signals
+        self.stage_progress = {}
+        self.worker = ConversionWorker(job, self)
+        self.worker.progress.connect(self.show_progress)
+        self.worker.result_ready.connect(self.conversion_finished)
+        self.set_running(True)
+        self.statusLabel.setText('Starting...')
+        self.worker.start()
+
+    def cancel_conversion(self):
+        if self.worker is not None:
+            self.worker.cancel()
+            self.cancelButton.setEnabled(False)
+            self.statusLabel.setText('Cancelling after the current page...')
+
+    def show_progress(self, stage, done, total):
+        self.stage_progress[stage] = (done, total)
+        if stage in ('OCR', 'Books'):
+            self.progressBar.setMaximum(total)
+            self.progressBar.setValue(done)
+
+        # Finished stages are dropped so long batches only list the books still running
+        if done >= total and stage != 'Books':
+            del self.stage_progress[stage]
+        self.statusLabel.setText('\n'.join(
+            f'{name}: {stage_done}/{stage_total}' for name, (stage_done, stage_total) in self.stage_progress.items()))
+
+    def conversion_finished(self, result_message):
+        self.worker.wait()
+        self.worker = None
+        self.set_running(False)
         self.statusLabel.setText(result_message)
+
+    def set_running(self, running):
+        self.convertButton.setEnabled(not running)
+        self.convertSelectedButton.setEnabled(not running)
+        self.preprocessCheck.setEnabled(not running)
+        self.cancelButton.setEnabled(running)
+        self.progressBar.setVisible(running)
+        if running:
+            self.progressBar.setValue(0)
+
+    def reject(self):
+        # Waiting here for the running Tesseract batches would freeze Calibre, so the dialog is only
+        # hidden, and deleted along with its worker thread once that thread has finished
+        if self.worker is not None:
+            self.worker.cancel()
+            self.worker.finished.connect(self.deleteLater)
+        QDialog.reject(self)